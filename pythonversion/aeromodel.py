@@ -0,0 +1,138 @@
+import argparse
+import os
+import numpy as np
+
+####################
+# Compiled Aerodynamic Drag Model
+# The aero drag regressor from new_formatted_model.pkl (sklearn MLPRegressor)
+# exported once to flat NumPy arrays (layer weights and biases) in a .npz file
+# and evaluated with plain matrix products: no pandas or sklearn at runtime
+#
+# Export: python pythonversion/aeromodel.py
+####################
+
+COMPILED_MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "new_formatted_model.npz"
+)
+
+# Model input columns in order (nx16), all in meters / m^2
+AERO_FEATURES = [
+    "hx",
+    "hy",
+    "sx",
+    "sy",
+    "cl",
+    "ll",
+    "ul",
+    "tl",
+    "al",
+    "sw",
+    "neckhead",
+    "back vertical height",
+    "head height",
+    "thigh width",
+    "leg area",
+    "frontal surface area",
+]
+
+# Hidden layer activations supported by sklearn MLPs
+ACTIVATIONS = {
+    "identity": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0, out=x),
+    "tanh": lambda x: np.tanh(x, out=x),
+    "logistic": lambda x: np.divide(1, 1 + np.exp(-x, out=x), out=x),
+}
+
+
+class CompiledAeroModel:
+    """
+    Feed forward regressor stored as flat arrays
+        coefs: list of layer weight matrices (in x out)
+        intercepts: list of layer bias vectors (out,)
+        activation: hidden layer activation name (output layer is identity)
+    predict(X) matches sklearn MLPRegressor.predict on the same nx16 array
+    """
+
+    def __init__(self, coefs, intercepts, activation="relu", feature_names=AERO_FEATURES):
+        if activation not in ACTIVATIONS:
+            raise ValueError("Unsupported activation", activation)
+        self.coefs = [np.ascontiguousarray(c, dtype=float) for c in coefs]
+        self.intercepts = [np.ascontiguousarray(b, dtype=float) for b in intercepts]
+        self.activation = activation
+        self.feature_names = list(feature_names)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """
+        Input: fitted sklearn MLPRegressor
+        Output: CompiledAeroModel with copied weights
+        """
+        if model.out_activation_ != "identity":
+            raise ValueError("Only identity output layers are supported", model.out_activation_)
+        feature_names = getattr(model, "feature_names_in_", AERO_FEATURES)
+        return cls(model.coefs_, model.intercepts_, model.activation, feature_names)
+
+    @classmethod
+    def load(cls, path=COMPILED_MODEL_PATH):
+        """
+        Input: OPTIONAL path to exported .npz
+        Output: CompiledAeroModel
+        """
+        with np.load(path) as data:
+            n_layers = int(data["n_layers"])
+            coefs = [data[f"coef_{i}"] for i in range(n_layers)]
+            intercepts = [data[f"intercept_{i}"] for i in range(n_layers)]
+            activation = str(data["activation"])
+            feature_names = [str(name) for name in data["feature_names"]]
+        return cls(coefs, intercepts, activation, feature_names)
+
+    def save(self, path=COMPILED_MODEL_PATH):
+        """
+        Input: OPTIONAL path for .npz output
+        Output: writes flat weight arrays to path
+        """
+        arrays = {}
+        for i, (coef, intercept) in enumerate(zip(self.coefs, self.intercepts)):
+            arrays[f"coef_{i}"] = coef
+            arrays[f"intercept_{i}"] = intercept
+        np.savez(
+            path,
+            n_layers=len(self.coefs),
+            activation=self.activation,
+            feature_names=np.array(self.feature_names),
+            **arrays,
+        )
+
+    def predict(self, X, batch_rows=4096):
+        """
+        Input: model input array (nx16), OPTIONAL rows per batch
+        Output: aerodynamic drag (n,) in Newtons
+        Rows are evaluated in batches so hidden activations stay in cache
+        """
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        if X.shape[1] != self.coefs[0].shape[0]:
+            raise ValueError("Expected input with columns", self.feature_names)
+
+        hidden = ACTIVATIONS[self.activation]
+        out = np.empty(len(X))
+        for start in range(0, len(X), batch_rows):
+            act = X[start:start + batch_rows]
+            for coef, intercept in zip(self.coefs[:-1], self.intercepts[:-1]):
+                act = act @ coef
+                act += intercept
+                hidden(act)
+            out[start:start + batch_rows] = (act @ self.coefs[-1] + self.intercepts[-1])[:, 0]
+        return out
+
+
+if __name__ == "__main__":
+    from demoanalysis import MODEL_PATH, load_global_model
+
+    parser = argparse.ArgumentParser(description="Export the pickled aero model to flat arrays")
+    parser.add_argument("model_path", nargs="?", default=MODEL_PATH)
+    parser.add_argument("out_path", nargs="?", default=COMPILED_MODEL_PATH)
+    args = parser.parse_args()
+    CompiledAeroModel.from_sklearn(load_global_model(args.model_path)).save(args.out_path)
+    print("Exported", args.model_path, "to", args.out_path)
@@ -0,0 +1,609 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+from interfacepoints import interface_points
+
+####################
+# Benchmarks for the bike catalog pipeline
+# Run: python pythonversion/benchmarks.py <benchmark> [<benchmark> ...]
+#
+# Catalogs are synthetic structural bike vectors (nx14) in mm and degrees
+# around a typical road bike so every stage sees realistic geometry
+####################
+
+# Demo body (1x8) in mm and degrees, same as demoanalysis.py
+DEMO_BODY = np.array(
+    [[19 * 25.4, 18 * 25.4, 21 * 25.4, 24 * 25.4, 5.5 * 25.4, 105, 12 * 25.4, 71 * 25.4]]
+)
+
+
+# Wall time budget (seconds) for a cold "import demoanalysis"
+IMPORT_BUDGET = 1.0
+
+
+def synthetic_bikes(n, seed=0):
+    """
+    Input: number of bikes, OPTIONAL seed
+    Output: structural bike vector array (nx14) in mm and degrees
+        [DTL, HTL, HTA, HTLE, SH, STL, STA, SPL, SH, SL, SA, SpA, CL, HB]
+    """
+    rng = np.random.default_rng(seed)
+    bikes = np.column_stack(
+        (
+            rng.uniform(580, 680, n),  # DT length
+            rng.uniform(110, 200, n),  # HT length
+            rng.uniform(70, 74, n),  # HT angle
+            rng.uniform(10, 30, n),  # HT lower extension
+            rng.uniform(520, 620, n),  # Stack height
+            rng.uniform(480, 580, n),  # ST length
+            rng.uniform(72, 75, n),  # ST angle
+            rng.uniform(200, 300, n),  # Seatpost length
+            rng.uniform(680, 780, n),  # Saddle height
+            rng.uniform(80, 130, n),  # Stem length
+            rng.uniform(-10, 10, n),  # Stem angle
+            rng.uniform(0, 30, n),  # Spacers
+            rng.choice([165, 170, 172.5, 175], n),  # Crank length
+            rng.integers(0, 3, n),  # Handlebar style
+        )
+    )
+    return bikes
+
+
+def best_time(func, *args, repeat=3, **kwargs):
+    """
+    Input: function, args, OPTIONAL repeat count, kwargs
+    Output: tuple (best wall time in seconds, result of last call)
+    """
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        res = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return (best, res)
+
+
+def _augmented_parameters_loop(int_points, body):
+    """
+    Reference per-row implementation of demoanalysis.augmented_parameters
+    (before vectorization) used as the benchmark baseline
+    Output: array of augmented parameters (nx5)
+    """
+    neckhead = body[:, 7] - body[:, 0] - body[:, 1] - body[:, 2]
+    new_body = np.hstack((body[0, :4], body[0, 6], neckhead))
+    config = np.hstack((int_points, np.broadcast_to(new_body, (len(int_points), 6))))
+
+    additionaldata = np.zeros((len(config), 5))
+    for i in range(len(config)):
+        hx, hy, sx, sy, cl, ll, ul, back, arm, sw, neckhead = config[i]
+        Lsh = np.sqrt((sx - 0.2 + hx) ** 2 + (sy - hy) ** 2)
+        Lspl = np.sqrt((sx - 0.2) ** 2 + sy**2) + cl
+        Tsh = np.arctan((hy - sy) / (sx - 0.2 + hx))
+        Tsp2 = np.arctan(-(sy + cl) / (sx - 0.2))
+        Tssh = np.arccos((back**2 + Lsh**2 - arm**2) / (2 * back * Lsh))
+        Tksp2 = np.arccos((ul**2 + Lspl**2 - ll**2) / (2 * ul * Lspl))
+        backverticalheight = back * np.sin(Tsh + Tssh)
+        shoulderheight = backverticalheight + sy
+        headheight = (back + neckhead) * np.sin(Tsh + Tssh)
+        armheight = shoulderheight - hx
+        theighwidth = (sw / 2 - 0.16) / 2
+        lowerkneeheight = ul * np.sin(Tksp2 + Tsp2)
+        if lowerkneeheight < sy:
+            legarea = (sy - lowerkneeheight) * (theighwidth - 0.12) + 2 * sy * 0.12
+        else:
+            legarea = 2 * sy * 0.12
+        frontalsa = (
+            armheight * 0.1 + shoulderheight * sw + np.pi / 16 + 0.1 * sw * np.cos(Tsh + Tssh)
+        )
+        additionaldata[i, :] = [backverticalheight, headheight, theighwidth, legarea, frontalsa]
+    return additionaldata
+
+
+def _all_rows_calculation(bikes, body):
+    """
+    Reference demoanalysis.bike_body_calculation (before validity first):
+    angles and augmented parameters for every row, masks applied afterwards
+    Output: results (nx4), NaN for invalid bikes
+    """
+    from demoanalysis import ANGLE_COLUMNS, aerodynamic_drag, augmented_parameters
+    from vectorizedangles import all_angles, validity_mask
+
+    int_points = interface_points(bikes)
+    angle_bikes = int_points[:, ANGLE_COLUMNS]
+    arm_angles = np.full((len(bikes), 1), 150.0)
+    bodies = np.broadcast_to(body, (len(bikes), 8))
+    angles = all_angles(angle_bikes, bodies, arm_angles)
+    aug = augmented_parameters(int_points, body).to_numpy() / 1000
+    aug[:, 3:5] /= 1000
+
+    invalid = validity_mask(angle_bikes, bodies, arm_angles).flatten()
+    invalid |= np.isnan(angles).any(axis=1) | np.isnan(aug).any(axis=1)
+    out = np.full((len(bikes), 4), np.nan)
+    out[~invalid, :3] = angles[~invalid]
+    out[~invalid, 3] = aerodynamic_drag(int_points[~invalid] / 1000, body, aug[~invalid])
+    return out
+
+
+def _dataframe_calculation(bikes, body):
+    """
+    Reference demoanalysis.bike_body_calculation (before FitBatch): ndarray and
+    DataFrame stages joined by column reorders, unit divisions and row masks
+    Output: dataframe (valid bikes, index is the input row)
+    """
+    import pandas as pd
+    from demoanalysis import ANGLE_COLUMNS, OUTPUT_COLUMNS, aerodynamic_drag, augmented_parameters
+    from vectorizedangles import all_angles, validity_mask
+
+    int_points = interface_points(bikes)
+    angle_bikes = int_points[:, ANGLE_COLUMNS]
+    arm_angles = np.ones((len(int_points), 1)) * 150
+    bodies = np.broadcast_to(body, (len(int_points), 8))
+
+    rows = np.flatnonzero(~validity_mask(angle_bikes, bodies, arm_angles).flatten())
+    valid_points = int_points[rows]
+    out_angles = all_angles(angle_bikes[rows], bodies[rows], arm_angles[rows])
+    out_aug = augmented_parameters(valid_points, body).to_numpy() / 1000
+    out_aug[:, 3:5] /= 1000
+
+    keep = ~(np.isnan(out_angles).any(axis=1) | np.isnan(out_aug).any(axis=1))
+    pred_aero = aerodynamic_drag(valid_points[keep] / 1000, body, out_aug[keep])
+    out = np.column_stack((out_angles[keep], pred_aero))
+    return pd.DataFrame(out, index=rows[keep], columns=OUTPUT_COLUMNS)
+
+
+def bench_augmented(sizes=(10_000, 100_000, 1_000_000), loop_limit=100_000):
+    """
+    Vectorized augmented_parameters vs the per-row loop
+    The loop is timed on at most loop_limit rows and scaled linearly above that
+    """
+    from demoanalysis import augmented_parameters
+
+    print("augmented_parameters: vectorized vs per-row loop")
+    print(f"{'rows':>10} {'loop (s)':>12} {'vector (s)':>12} {'speedup':>10}")
+    for n in sizes:
+        int_points = interface_points(synthetic_bikes(n))
+        vec_time, vec_out = best_time(augmented_parameters, int_points, DEMO_BODY)
+
+        loop_n = min(n, loop_limit)
+        loop_time, loop_out = best_time(
+            _augmented_parameters_loop, int_points[:loop_n], DEMO_BODY, repeat=1
+        )
+        if not np.allclose(vec_out.values[:loop_n], loop_out, equal_nan=True):
+            raise AssertionError("vectorized augmented_parameters does not match loop")
+        loop_time *= n / loop_n
+
+        est = "*" if loop_n < n else " "
+        print(f"{n:>10} {loop_time:>11.3f}{est} {vec_time:>12.4f} {loop_time / vec_time:>9.0f}x")
+    print("* loop time extrapolated linearly from", loop_limit, "rows")
+
+
+def bench_import(budget=IMPORT_BUDGET, repeat=3):
+    """
+    Cold import time of demoanalysis in a fresh interpreter
+    Exits non-zero if the best time is over budget or the aero model was loaded
+    """
+    code = (
+        "import time; start = time.perf_counter(); import demoanalysis; "
+        "print(time.perf_counter() - start, demoanalysis.load_global_model.cache_info().currsize"
+        " + demoanalysis.load_compiled_model.cache_info().currsize)"
+    )
+    here = os.path.dirname(os.path.abspath(__file__))
+    best = np.inf
+    for _ in range(repeat):
+        res = subprocess.run(
+            [sys.executable, "-c", code], cwd=here, capture_output=True, text=True, check=True
+        )
+        import_time, models_loaded = res.stdout.split()
+        best = min(best, float(import_time))
+        if int(models_loaded) != 0:
+            sys.exit("import demoanalysis loaded the aero model")
+
+    print(f"import demoanalysis: {best:.3f} s (budget {budget:.3f} s)")
+    if best > budget:
+        sys.exit("import demoanalysis is over the import time budget")
+
+
+def _aero_inputs(n):
+    """
+    Output: aero model input array (nx16) in meters for n valid synthetic bikes
+    """
+    from demoanalysis import augmented_parameters
+
+    int_points = interface_points(synthetic_bikes(n))
+    aug = augmented_parameters(int_points, DEMO_BODY).values / 1000
+    aug[:, 3:] /= 1000
+    neckhead = DEMO_BODY[:, 7] - DEMO_BODY[:, 0] - DEMO_BODY[:, 1] - DEMO_BODY[:, 2]
+    new_body = np.hstack((DEMO_BODY[0, :4], DEMO_BODY[0, 6], neckhead)) * 0.001
+    joined = np.hstack((int_points / 1000, np.broadcast_to(new_body, (n, 6)), aug))
+    return joined[~np.isnan(joined).any(axis=1)]
+
+
+def bench_aero(throughput_rows=100_000, latency_calls=200):
+    """
+    Compiled aero model vs sklearn predict on a pandas DataFrame
+    Checks parity, single row latency and batch throughput
+    """
+    import pandas as pd
+    from aeromodel import AERO_FEATURES
+    from demoanalysis import load_compiled_model, load_global_model
+
+    sk_model = load_global_model()
+    compiled = load_compiled_model()
+    X = _aero_inputs(throughput_rows)
+
+    sk_pred = sk_model.predict(pd.DataFrame(X, columns=AERO_FEATURES))
+    max_diff = np.max(np.abs(compiled.predict(X) - sk_pred))
+    print(f"aero model parity: max |compiled - sklearn| = {max_diff:.3e} N over {len(X)} rows")
+    if not np.allclose(compiled.predict(X), sk_pred, rtol=1e-9, atol=1e-9):
+        raise AssertionError("compiled aero model does not match sklearn predict")
+
+    def sk_single(row):
+        return sk_model.predict(pd.DataFrame(row, columns=AERO_FEATURES))
+
+    sk_lat, _ = best_time(lambda: [sk_single(X[i:i + 1]) for i in range(latency_calls)])
+    c_lat, _ = best_time(lambda: [compiled.predict(X[i:i + 1]) for i in range(latency_calls)])
+    sk_thr, _ = best_time(sk_model.predict, pd.DataFrame(X, columns=AERO_FEATURES))
+    c_thr, _ = best_time(compiled.predict, X)
+
+    print(f"{'':>22} {'single row (us)':>16} {'rows / s':>14}")
+    print(f"{'sklearn + DataFrame':>22} {sk_lat / latency_calls * 1e6:>16.1f} {len(X) / sk_thr:>14.3e}")
+    print(f"{'compiled':>22} {c_lat / latency_calls * 1e6:>16.1f} {len(X) / c_thr:>14.3e}")
+
+
+def bench_parallel(n=200_000, n_bodies=4, worker_counts=None):
+    """
+    Scaling of parallel_bike_body_calculation from 1 to N workers
+    (default powers of 2 up to the core count) against the serial loop over bodies
+    """
+    from demoanalysis import bike_body_calculation
+    from parallel import parallel_bike_body_calculation
+
+    bikes = synthetic_bikes(n)
+    bodies = DEMO_BODY * np.linspace(0.95, 1.05, n_bodies)[:, np.newaxis]
+    if worker_counts is None:
+        top = max(2, os.cpu_count())
+        worker_counts = [2**i for i in range(top.bit_length()) if 2**i <= top]
+
+    serial, _ = best_time(
+        lambda: [bike_body_calculation(bikes, bodies[i:i + 1]) for i in range(n_bodies)], repeat=1
+    )
+    print(f"parallel_bike_body_calculation: {n} bikes x {n_bodies} bodies ({os.cpu_count()} cores)")
+    print(f"{'workers':>8} {'time (s)':>10} {'speedup':>10}")
+    print(f"{'serial':>8} {serial:>10.3f} {1:>9.2f}x")
+    for workers in worker_counts:
+        par, _ = best_time(parallel_bike_body_calculation, bikes, bodies, workers, repeat=1)
+        print(f"{workers:>8} {par:>10.3f} {serial / par:>9.2f}x")
+
+
+def bench_index(sizes=(10_000, 100_000, 1_000_000), k=10, use="road"):
+    """
+    FitIndex top-k query vs brute force all_angles + fit_scores over the catalog
+    Checks the index returns the exact brute force top-k scores
+    """
+    from fitindex import FitIndex
+    from vectorizedangles import all_angles, fit_scores
+
+    bodies = DEMO_BODY * np.array([[0.94], [1.0], [1.06]])
+
+    print(f"FitIndex top-{k} query vs brute force ({use}, mean of {len(bodies)} bodies)")
+    print(f"{'rows':>10} {'build (s)':>10} {'query (ms)':>11} {'brute (ms)':>11} {'evaluated':>10}")
+    for n in sizes:
+        int_points = interface_points(synthetic_bikes(n))
+        build, index = best_time(FitIndex.from_interface_points, int_points, repeat=1)
+        bike_vectors = int_points[:, [2, 3, 0, 1, 4]]
+
+        query_t = brute_t = evaluated = 0
+        for body in bodies:
+            t, (res, n_eval) = best_time(index.query, body[np.newaxis], k, use, ret_stats=True)
+            query_t += t / len(bodies)
+            evaluated += n_eval / len(bodies)
+
+            def brute():
+                angles = all_angles(
+                    bike_vectors, np.broadcast_to(body, (n, 8)), np.full((n, 1), 150.0)
+                )
+                return fit_scores(angles, use)
+
+            t, scores = best_time(brute, repeat=1)
+            brute_t += t / len(bodies)
+            top = np.sort(scores[~np.isnan(scores)])[::-1][:k]
+            if not np.allclose(res["Fit Score"].to_numpy(), top):
+                raise AssertionError("FitIndex top-k does not match brute force")
+
+        print(f"{n:>10} {build:>10.2f} {query_t * 1e3:>11.1f} {brute_t * 1e3:>11.1f} {evaluated:>10.0f}")
+
+
+def bench_uncertainty(sizes=(10_000, 100_000, 1_000_000), error=25.4):
+    """
+    Monte Carlo body uncertainty (monte_carlo_fit) time per customer request
+    """
+    from uncertainty import monte_carlo_fit
+
+    bike_vector = interface_points(synthetic_bikes(1))[:, [2, 3, 0, 1, 4]]
+    monte_carlo_fit(bike_vector, DEMO_BODY, error, samples=10)
+
+    print(f"monte_carlo_fit ({error} mm error on every body dimension)")
+    print(f"{'samples':>10} {'time (s)':>10} {'valid':>8}")
+    for n in sizes:
+        t, out_df = best_time(monte_carlo_fit, bike_vector, DEMO_BODY, error, samples=n, seed=0)
+        print(f"{n:>10} {t:>10.3f} {out_df.attrs['valid_fraction']:>8.3f}")
+
+
+def bench_lut(n=1_000_000, sizes=(256, 1024, 4096, 16384)):
+    """
+    KneeLUT interpolated knee extension vs closed form min_knee_extension_angle
+    Reports the table's own max error and the observed error over the catalog
+    """
+    from kneelut import KneeLUT
+    from vectorizedangles import min_knee_extension_angle
+
+    bike_vectors = interface_points(synthetic_bikes(n))[:, [2, 3, 0, 1, 4]]
+    bodies = np.broadcast_to(DEMO_BODY, (n, DEMO_BODY.shape[1]))
+    exact_t, exact = best_time(min_knee_extension_angle, bike_vectors, bodies)
+
+    print(f"Knee extension over {n} bikes: closed form {exact_t:.3f} s")
+    print(f"{'nodes':>8} {'build (ms)':>11} {'max error':>10} {'observed':>10} {'lut (s)':>8} {'speedup':>8}")
+    for size in sizes:
+        build, lut = best_time(KneeLUT, DEMO_BODY, size)
+        t, approx = best_time(lut.min_knee_extension_angle, bike_vectors)
+        if not np.array_equal(np.isnan(approx), np.isnan(exact)):
+            raise AssertionError("KneeLUT validity does not match min_knee_extension_angle")
+        observed = np.nanmax(np.abs(approx - exact))
+        print(
+            f"{size:>8} {build * 1e3:>11.2f} {lut.max_error:>10.2e} {observed:>10.2e}"
+            f" {t:>8.3f} {exact_t / t:>7.1f}x"
+        )
+
+
+def bench_prepared(n=1_000_000):
+    """
+    One rider against a catalog: prepare_body(...).all_angles vs all_angles
+    """
+    from vectorizedangles import all_angles, prepare_body
+
+    bike_vectors = interface_points(synthetic_bikes(n))[:, [2, 3, 0, 1, 4]]
+    bodies = np.broadcast_to(DEMO_BODY, (n, DEMO_BODY.shape[1]))
+    base_t, base = best_time(all_angles, bike_vectors, bodies, np.full((n, 1), 150.0))
+    prep_t, prepared = best_time(prepare_body, DEMO_BODY, 150)
+    t, out = best_time(prepared.all_angles, bike_vectors)
+    if not np.allclose(out, base, rtol=0, atol=1e-9, equal_nan=True):
+        raise AssertionError("PreparedBody.all_angles does not match all_angles")
+
+    print(f"all_angles over {n} bikes for one body")
+    print(f"  all_angles:              {base_t:.3f} s")
+    print(f"  prepare_body:            {prep_t * 1e6:.1f} us")
+    print(f"  PreparedBody.all_angles: {t:.3f} s ({base_t / t:.1f}x)")
+
+
+def bench_dedup(n=200_000, unique_fractions=(1.0, 0.5, 0.1, 0.01)):
+    """
+    dedup_bike_body_calculation vs bike_body_calculation on catalogs with repeated frames
+    """
+    from dedup import dedup_bike_body_calculation
+    from demoanalysis import bike_body_calculation
+
+    rng = np.random.default_rng(0)
+    print(f"Dedup over {n} bikes")
+    print(f"{'unique':>8} {'ratio':>7} {'plain (s)':>10} {'dedup (s)':>10} {'speedup':>8}")
+    for fraction in unique_fractions:
+        frames = synthetic_bikes(max(1, int(n * fraction)))
+        bikes = frames[rng.integers(0, len(frames), n)]
+        plain_t, plain = best_time(bike_body_calculation, bikes, DEMO_BODY, repeat=1)
+        dedup_t, dedup = best_time(dedup_bike_body_calculation, bikes, DEMO_BODY, repeat=1)
+        # Aero batches differ in size, so drag can differ in the last bit
+        same = plain.index.equals(dedup.index) and np.allclose(
+            plain.values, dedup.values, rtol=0, atol=1e-9
+        )
+        if not same:
+            raise AssertionError("dedup results do not match bike_body_calculation")
+        print(
+            f"{fraction:>8} {dedup.attrs['dedup_ratio']:>7.1f} {plain_t:>10.3f}"
+            f" {dedup_t:>10.3f} {plain_t / dedup_t:>7.1f}x"
+        )
+
+
+def bench_validity(n=200_000, invalid_fractions=(0.0, 0.5, 0.9, 0.99)):
+    """
+    Validity first bike_body_calculation vs evaluating every row then masking
+    Invalid rows get an unreachable crank length (leg triangle violation)
+    """
+    from demoanalysis import bike_body_calculation
+
+    rng = np.random.default_rng(0)
+    print(f"Validity first pipeline over {n} bikes")
+    print(f"{'invalid':>8} {'all rows (s)':>13} {'valid first (s)':>16} {'speedup':>8}")
+    for fraction in invalid_fractions:
+        bikes = synthetic_bikes(n)
+        bikes[rng.random(n) < fraction, 4] *= 10
+        base_t, base = best_time(_all_rows_calculation, bikes, DEMO_BODY, repeat=1)
+        t, out_df = best_time(bike_body_calculation, bikes, DEMO_BODY, True, repeat=1)
+        if not np.allclose(out_df.to_numpy(), base, rtol=0, atol=1e-9, equal_nan=True):
+            raise AssertionError("validity first results do not match the all rows reference")
+        print(f"{fraction:>8} {base_t:>13.3f} {t:>16.3f} {base_t / t:>7.1f}x")
+
+
+def bench_pipeline(sizes=(10_000, 100_000, 1_000_000)):
+    """
+    FitBatch bike_body_calculation vs the DataFrame/ndarray pipeline it replaced,
+    results must match. Both evaluate the aero model on the same rows, its time
+    is also subtracted to show the stages and data movement alone
+    """
+    from demoanalysis import bike_body_calculation, load_compiled_model
+
+    print("bike_body_calculation pipeline (FitBatch columns vs DataFrame churn)")
+    print(f"{'rows':>9} {'reference (s)':>14} {'FitBatch (s)':>13} {'speedup':>8} {'without aero model':>20}")
+    model = load_compiled_model()
+    for n in sizes:
+        bikes = synthetic_bikes(n)
+        base_t, base = best_time(_dataframe_calculation, bikes, DEMO_BODY)
+        t, out_df = best_time(bike_body_calculation, bikes, DEMO_BODY)
+        if not (out_df.index.equals(base.index) and np.allclose(out_df.to_numpy(), base.to_numpy(), rtol=0, atol=1e-9)):
+            raise AssertionError("FitBatch results do not match the reference pipeline")
+
+        # Model inputs are (rows x 16), only the row count matters for its time
+        aero_t, _ = best_time(model.predict, np.ones((len(out_df), len(model.feature_names))))
+        print(
+            f"{n:>9} {base_t:>14.3f} {t:>13.3f} {base_t / t:>7.1f}x"
+            f" {base_t - aero_t:>8.3f} vs {t - aero_t:.3f} s ({(base_t - aero_t) / (t - aero_t):.1f}x)"
+        )
+
+
+def bench_hip(n=2000, step=0.05, tol=1e-3):
+    """
+    Closed hip angle from all_angles(hip=True) vs the minimum of the trajectory
+    "Hip Angle" channel over a fine crank angle grid (bodies scaled +-10%)
+    """
+    from trajectory import TRAJECTORY_CHANNELS, iter_pedal_trajectories
+    from vectorizedangles import all_angles
+
+    rng = np.random.default_rng(0)
+    bike_vectors = interface_points(synthetic_bikes(n))[:, [2, 3, 0, 1, 4]]
+    bodies = np.repeat(DEMO_BODY, n, axis=0)
+    bodies[:, :5] *= rng.uniform(0.9, 1.1, (n, 5))
+    arm_angles = np.full((n, 1), 150.0)
+
+    t, angles = best_time(all_angles, bike_vectors, bodies, arm_angles, hip=True)
+    crank_angles = np.arange(0, 360, step)
+    channel = TRAJECTORY_CHANNELS.index("Hip Angle")
+    sweep = np.empty(n)
+    for start, traj in iter_pedal_trajectories(bike_vectors, bodies, arm_angles, crank_angles):
+        # float32 trajectories, the row minimum is taken in float64
+        sweep[start:start + len(traj)] = np.min(traj[:, :, channel].astype(float), axis=1)
+
+    both = ~np.isnan(angles[:, 3]) & ~np.isnan(sweep)
+    if not np.array_equal(np.isnan(angles[:, 3]), np.isnan(sweep)):
+        raise AssertionError("closed hip angle NaN pattern differs from the trajectory sweep")
+    err = np.max(np.abs(angles[both, 3] - sweep[both]))
+    print(f"Closed hip angle over {n} bikes vs {step} degree trajectory sweep")
+    print(f"  all_angles(hip=True): {t * 1e3:.2f} ms, max |closed form - sweep min| {err:.1e} degrees")
+    if err > tol:
+        raise AssertionError("closed hip angle is not the trajectory minimum")
+
+
+def _angles_py_fit(bike_row, body_row, arm_angle, use="road"):
+    """
+    Work of the scalar angles.py path for one fit: 32 knee_extension_angle calls,
+    back_armpit_angles and 3 prob (scipy norm.cdf) calls
+    angles.all_angles mixes row (knee) and column (back) indexing, so the
+    kernels are called directly with the shape each one expects
+        bike_row: 1 x 5 angles.py convention (SX = -vectorizedangles SX)
+        body_row: 1 x 6 with AA in radians
+    """
+    import angles
+
+    ke = [angles.knee_extension_angle(bike_row, body_row, step * 0.2) for step in range(32)]
+    ke = None if any(k is None for k in ke) else angles.rad_to_d(min(ke)[0])
+    back, awrist = angles.back_armpit_angles(bike_row.T, body_row.T, arm_angle)
+    fit = [ke] + [angles.rad_to_d(a) if a is not None else None for a in (back, awrist)]
+    keys = ["opt_knee_angle", "opt_back_angle", "opt_awrist_angle"]
+    return [angles.prob(*angles.USE_DICT[use][key][:2], a) for key, a in zip(keys, fit)]
+
+
+def bench_scalar(calls=2000):
+    """
+    Per fit latency (microseconds) for one bike and one body:
+    fastfit (math module) vs scalar angles.py vs vectorizedangles on 1 row arrays
+    """
+    from fastfit import fit_probs
+    from vectorizedangles import all_angles, fit_scores
+
+    bike = interface_points(synthetic_bikes(1))[0, [2, 3, 0, 1, 4]]
+    body = DEMO_BODY[0]
+
+    bike_list, body_list = bike.tolist(), body.tolist()
+    bike_row = bike[np.newaxis] * np.array([-1, 1, 1, 1, 1])
+    body_row = body[np.newaxis, :6] * np.array([1, 1, 1, 1, 1, np.pi / 180])
+    bike_arr, body_arr, arm_arr = bike[np.newaxis], body[np.newaxis], np.full((1, 1), 150.0)
+
+    def vectorized():
+        return fit_scores(all_angles(bike_arr, body_arr, arm_arr))
+
+    paths = [
+        ("fastfit.fit_probs", lambda: fit_probs(bike_list, body_list, 150)),
+        ("angles.py kernels", lambda: _angles_py_fit(bike_row, body_row, 150)),
+        ("vectorizedangles 1 row", vectorized),
+    ]
+    # Warm up (angles.py prob pays the scipy import)
+    for _, func in paths:
+        func()
+
+    print(f"Single fit latency (best of 3 x {calls} calls)")
+    fast = None
+    for name, func in paths:
+        t, _ = best_time(lambda: [func() for _ in range(calls)])
+        fast = fast or t
+        print(f"  {name:<24} {t / calls * 1e6:>8.1f} us ({t / fast:.0f}x)")
+
+
+def bench_scoring(n=1_000_000):
+    """
+    prob_dists scoring kernel (USE_TABLE gather + erfc) on a mixed use case batch
+    vs per use case scipy norm.cdf scoring, and max error against scipy norm.sf
+    """
+    from scipy.stats import norm
+    from usecases import USE_ANGLES, USE_CODES, USE_DICT
+    from vectorizedangles import all_angles, angle_probs
+
+    bike_vectors = interface_points(synthetic_bikes(n))[:, [2, 3, 0, 1, 4]]
+    bodies = np.broadcast_to(DEMO_BODY, (n, DEMO_BODY.shape[1]))
+    angles = all_angles(bike_vectors, bodies, np.full((n, 1), 150.0), hip=True)
+    codes = np.random.default_rng(0).integers(0, len(USE_CODES), n)
+    k = len(USE_ANGLES)
+
+    def scipy_scores():
+        out = np.empty((n, k + 1))
+        for use, code in USE_CODES.items():
+            rows = codes == code
+            for i, angle in enumerate(USE_ANGLES):
+                mean, sd = USE_DICT[use][angle][:2]
+                out[rows, i] = (1 - norm.cdf(abs(angles[rows, i] - mean) / sd)) * 2
+        out[:, k] = np.prod(out[:, :k], axis=1)
+        return out
+
+    t, probs = best_time(angle_probs, angles, codes, True)
+    ref_t, _ = best_time(scipy_scores)
+    exact = np.empty((n, k))
+    for use, code in USE_CODES.items():
+        rows = codes == code
+        for i, angle in enumerate(USE_ANGLES):
+            mean, sd = USE_DICT[use][angle][:2]
+            exact[rows, i] = 2 * norm.sf(abs(angles[rows, i] - mean) / sd)
+    err = np.nanmax(np.abs(probs[:, :k] - exact) / exact)
+
+    print(f"Mixed road/mtb/commute scoring over {n} rows ({k} probs + combined)")
+    print(f"  angle_probs (erfc):     {t:.3f} s")
+    print(f"  scipy norm.cdf per use: {ref_t:.3f} s ({ref_t / t:.1f}x)")
+    print(f"  max relative error vs norm.sf: {err:.1e}")
+
+
+BENCHMARKS = {
+    "augmented": bench_augmented,
+    "aero": bench_aero,
+    "parallel": bench_parallel,
+    "index": bench_index,
+    "lut": bench_lut,
+    "prepared": bench_prepared,
+    "dedup": bench_dedup,
+    "validity": bench_validity,
+    "pipeline": bench_pipeline,
+    "scalar": bench_scalar,
+    "scoring": bench_scoring,
+    "hip": bench_hip,
+    "uncertainty": bench_uncertainty,
+    "import": bench_import,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bike catalog pipeline benchmarks")
+    parser.add_argument("benchmarks", nargs="*", help=f"any of {list(BENCHMARKS)} (default all)")
+    args = parser.parse_args()
+    names = args.benchmarks or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark {name!r}")
+    for name in names:
+        BENCHMARKS[name]()
+        print()
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+from demoanalysis import (
+    ANGLE_COLUMNS,
+    OUTPUT_COLUMNS,
+    aerodynamic_drag,
+    augmented_array,
+)
+from interfacepoints import interface_points
+from vectorizedangles import fit_scores, prepare_body
+
+####################
+# Many Bodies x Many Bikes Cross Product
+# Main Function to Call: cross_bike_body_calculation(bodies, bikes)
+#
+# Inputs are body vector array (mx8) and bike vector array (nx14)
+# Input Units: mm and degrees positive SX -> is behind BB
+#
+# Interface points are computed once per bike and reused for every body,
+# each body is evaluated with its body terms factored out (prepare_body)
+# against the shared bike arrays, and bodies are grouped in blocks of
+# (block bodies x n bikes) result rows sized to a memory budget, so the
+# top-k mode never holds the full m x n table
+####################
+
+# Memory budget (bytes) for one block of (body, bike) rows
+DEFAULT_CROSS_BYTES = 256 * 1024**2
+# Approximate bytes of temporaries per (body, bike) row across all stages
+CROSS_ROW_BYTES = 1024
+# Default elbow angle (same as bike_body_calculation)
+DEFAULT_ARM_ANGLE = 150
+
+
+def _block_rows(int_points, angle_bikes, bodies, arm_angle):
+    """
+    Input: interface points (nx5) and their vectorizedangles order (nx5) shared by all
+           bodies, block of bodies (bx8), elbow angle
+    Output: tuple (angles (b*n x 3), augmented parameters in m (b*n x 5), valid mask (b*n,))
+            rows are body major: row = body * n + bike
+            valid matches the combined NaN mask of bike_body_calculation
+    """
+    n = len(int_points)
+    b = len(bodies)
+    angles = np.empty((b * n, 3))
+    aug = np.empty((b * n, 5))
+    invalid = np.empty(b * n, dtype=bool)
+
+    for i in range(b):
+        rows = slice(i * n, (i + 1) * n)
+        prepared = prepare_body(bodies[i], arm_angle)
+        angles[rows] = prepared.all_angles(angle_bikes)
+        augmented_array(int_points, bodies[i:i + 1], out=aug[rows])
+        invalid[rows] = prepared.validity_mask(angle_bikes)[:, 0]
+
+    aug /= 1000  # convert to m
+    aug[:, 3:5] /= 1000  # convert areas to m^2
+    invalid |= np.isnan(angles).any(axis=1) | np.isnan(aug).any(axis=1)
+    return (angles, aug, ~invalid)
+
+
+def _block_drag(int_points, bodies, aug, valid, rows):
+    """
+    Input: interface points (nx5), block of bodies (bx8), augmented parameters (m),
+           valid mask, block rows (body * n + bike) to evaluate
+    Output: aerodynamic drag (len(rows),) in Newtons, NaN for invalid rows
+    """
+    ok = valid[rows]
+    drag = np.full(len(rows), np.nan)
+    body_i, bike_i = np.divmod(rows[ok], len(int_points))
+    drag[ok] = aerodynamic_drag(int_points[bike_i] / 1000, bodies[body_i], aug[rows[ok]])
+    return drag
+
+
+def cross_bike_body_calculation(
+    bodies, bikes, top_k=None, use="road", arm_angle=DEFAULT_ARM_ANGLE, max_bytes=DEFAULT_CROSS_BYTES
+):
+    """
+    Input: body vector array (mx8), bike vector array (nx14),
+           OPTIONAL top k bikes per body, OPTIONAL usecase for ranking,
+           OPTIONAL elbow angle in degrees, OPTIONAL memory budget in bytes
+    Output:
+        top_k = None:
+            array (m x n x 4) of knee extension, back angle, armpit angle,
+            aerodynamic drag, NaN for invalid (body, bike) pairs
+        top_k = k:
+            dataframe indexed by (Body, Rank) with columns
+            Row (catalog row, -1 if fewer than k valid bikes), Fit Score and
+            the 4 output columns, ranked by fit_scores for the usecase
+            drag is only evaluated for the selected bikes
+    !!! UNITS: mm and degrees !!!
+    """
+    if top_k is not None and top_k <= 0:
+        raise ValueError("top_k must be a positive number of bikes", top_k)
+    bodies = np.atleast_2d(np.asarray(bodies, dtype=float))
+    m = len(bodies)
+    n = len(bikes)
+    int_points = interface_points(bikes)
+    angle_bikes = int_points[:, ANGLE_COLUMNS]
+
+    # Bodies per block so one block of b x n rows fits the budget
+    block = max(1, int(max_bytes // (CROSS_ROW_BYTES * max(n, 1))))
+
+    if top_k is None:
+        out = np.empty((m, n, 4))
+    else:
+        k = min(top_k, n)
+        top_rows = np.full((m, top_k), -1)
+        top_out = np.full((m, top_k, 5), np.nan)
+
+    for start in range(0, m if n else 0, block):
+        stop = min(start + block, m)
+        block_bodies = bodies[start:stop]
+        angles, aug, valid = _block_rows(int_points, angle_bikes, block_bodies, arm_angle)
+
+        if top_k is None:
+            drag = _block_drag(int_points, block_bodies, aug, valid, np.arange(len(valid)))
+            block_out = np.column_stack((angles, drag))
+            block_out[~valid] = np.nan
+            out[start:stop] = block_out.reshape(stop - start, n, 4)
+            continue
+
+        # Rank by fit score, invalid pairs go last
+        score = np.where(valid, fit_scores(angles, use), -1.0).reshape(stop - start, n)
+        best = np.argpartition(-score, k - 1, axis=1)[:, :k]
+        best = np.take_along_axis(
+            best, np.argsort(-np.take_along_axis(score, best, axis=1), axis=1), axis=1
+        )
+        best_score = np.take_along_axis(score, best, axis=1)
+
+        # Drag only for the selected (body, bike) rows
+        sel = (best + (np.arange(stop - start) * n)[:, np.newaxis]).ravel()
+        sel_valid = valid[sel]
+        sel_drag = _block_drag(int_points, block_bodies, aug, valid, sel)
+        sel_out = np.column_stack((best_score.ravel(), angles[sel], sel_drag))
+        sel_out[~sel_valid] = np.nan
+
+        top_rows[start:stop, :k] = np.where(sel_valid, best.ravel(), -1).reshape(-1, k)
+        top_out[start:stop, :k] = sel_out.reshape(-1, k, 5)
+
+    if top_k is None:
+        return out
+
+    index = pd.MultiIndex.from_product((range(m), range(top_k)), names=["Body", "Rank"])
+    out_df = pd.DataFrame(
+        top_out.reshape(m * top_k, 5), index=index, columns=["Fit Score"] + OUTPUT_COLUMNS
+    )
+    out_df.insert(0, "Row", top_rows.ravel())
+    return out_df
@@ -1,21 +1,40 @@
+import argparse
 import pandas as pd
 import numpy as np
 from interfacepoints import interface_points
-from vectorizedangles import all_angles,prob_dists
 
+# Default dataset locations
+BIKE_VECTOR_CSV = "/Users/noahwiley/Documents/Bike UROP/MeasureML-main/Frame Datasets/bike_vector_df_with_id.csv"
+INT_POINTS_CSV = "/Users/noahwiley/Documents/Bike UROP/MeasureML-main/Frame Datasets/bikes_with_int_points.csv"
 
-bike_vector_df = pd.read_csv("/Users/noahwiley/Documents/Bike UROP/MeasureML-main/Frame Datasets/bike_vector_df_with_id.csv")
-# Col with down tube length
-#print("bike_vector_df\n", bike_vector_df)
-without_id_array = bike_vector_df.iloc[:, 2:].values
-#print("without_id_array", without_id_array)
-int_point_array = interface_points(without_id_array)
-int_point_df = pd.DataFrame(columns=["hand_x", "hand_y", "seat_x", "seat_y", "crank_length"])
-for i, col in enumerate(["hand_x", "hand_y", "seat_x", "seat_y", "crank_length"]):
-    int_point_df[col] = int_point_array[:, i]
-print("int_point_df\n", int_point_df)
-combined_df = bike_vector_df.merge(int_point_df, left_index=True, right_index=True, how="inner")
 
-combined_df.to_csv("/Users/noahwiley/Documents/Bike UROP/MeasureML-main/Frame Datasets/bikes_with_int_points.csv")
+def add_interface_points(in_path=BIKE_VECTOR_CSV, out_path=INT_POINTS_CSV):
+    """
+    Input: OPTIONAL bike vector csv path (2 id columns then nx14), OPTIONAL output csv path
+    Output: writes bike vectors joined with interface points to out_path
+            returns combined dataframe
+    """
+    bike_vector_df = pd.read_csv(in_path)
+    # Col with down tube length
+    #print("bike_vector_df\n", bike_vector_df)
+    without_id_array = bike_vector_df.iloc[:, 2:].values
+    #print("without_id_array", without_id_array)
+    int_point_array = interface_points(without_id_array)
+    int_point_df = pd.DataFrame(columns=["hand_x", "hand_y", "seat_x", "seat_y", "crank_length"])
+    for i, col in enumerate(["hand_x", "hand_y", "seat_x", "seat_y", "crank_length"]):
+        int_point_df[col] = int_point_array[:, i]
+    print("int_point_df\n", int_point_df)
+    combined_df = bike_vector_df.merge(int_point_df, left_index=True, right_index=True, how="inner")
 
-print(combined_df[np.isnan(combined_df["hand_x"])])
\ No newline at end of file
+    combined_df.to_csv(out_path)
+
+    print(combined_df[np.isnan(combined_df["hand_x"])])
+    return combined_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add interface points to a bike vector csv")
+    parser.add_argument("in_path", nargs="?", default=BIKE_VECTOR_CSV)
+    parser.add_argument("out_path", nargs="?", default=INT_POINTS_CSV)
+    args = parser.parse_args()
+    add_interface_points(args.in_path, args.out_path)
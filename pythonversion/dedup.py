@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from demoanalysis import interface_body_calculation
+from interfacepoints import interface_points
+
+####################
+# Duplicate Geometry Removal
+# Main Function to Call: dedup_bike_body_calculation(bikes, body, tol)
+#
+# Catalogs repeat the same frame (colorways, stock builds), and every output
+# of bike_body_calculation only depends on the interface points and the body
+# Unique interface point rows (optionally quantized to tol) are evaluated
+# once and the results are scattered back to every original row
+####################
+
+
+def dedup_rows(rows, tol=None):
+    """
+    Input: array (nxm), OPTIONAL tolerance (rows equal after rounding to tol are duplicates)
+    Output: tuple (first row of each unique group (u,), group of each row (n,))
+            rows[first][group] reproduces rows (to within tol)
+    Hash based (pandas factorize one column at a time), no sort of the rows
+    """
+    rows = np.asarray(rows, dtype=float)
+    keys = rows if tol is None else np.round(rows / tol)
+
+    # Combine column codes into one group code, renumbering after each column
+    group = np.zeros(len(keys), dtype=np.int64)
+    for col in keys.T:
+        codes, uniques = pd.factorize(col, use_na_sentinel=False)
+        group, _ = pd.factorize(group * len(uniques) + codes)
+    _, first = np.unique(group, return_index=True)
+    return (first, group)
+
+
+def dedup_bike_body_calculation(bikes, body, tol=None):
+    """
+    Input: bike vector array (nx14), body vector(1x8), OPTIONAL tolerance in mm
+    Output: same as bike_body_calculation (invalid bikes dropped, index is the input row)
+            every bike gets the result of the first bike with the same (quantized)
+            interface points
+            out_df.attrs["dedup_ratio"] = input rows / unique rows evaluated
+    !!! UNITS: mm and degrees !!!
+    """
+    int_points = interface_points(bikes)
+    first, group = dedup_rows(int_points, tol)
+    unique_df = interface_body_calculation(int_points[first], body)
+
+    # unique_df index is the row into first, scatter back through group
+    valid = np.isin(group, unique_df.index.to_numpy())
+    out_df = unique_df.loc[group[valid]]
+    out_df.index = np.flatnonzero(valid)
+    out_df.attrs["dedup_ratio"] = len(bikes) / max(len(first), 1)
+    return out_df
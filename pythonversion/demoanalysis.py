@@ -1,6 +1,12 @@
+from aeromodel import COMPILED_MODEL_PATH, CompiledAeroModel
+from fitbatch import FitBatch
 from interfacepoints import interface_points
-from vectorizedangles import all_angles, validity_mask
+from inversefit import ELBOW_TARGETS, solve_elbow_angle
+from vectorizedangles import all_angles, kops, validity_mask
+from functools import lru_cache
+import argparse
 import numpy as np
+import os
 import pickle
 import pandas as pd
 import time
@@ -19,111 +25,155 @@ import time
 ####################
 
 
-# GLOBAL MODEL
-global_model = pickle.load(open("pythonversion/new_formatted_model.pkl", "rb"))[2]
+# Output columns of bike_body_calculation
+OUTPUT_COLUMNS = ["Knee Extension", "Back Angle", "Armpit Angle", "Aerodynamic Drag"]
+# Optional knee over pedal spindle column (bike_body_calculation add_kops)
+KOPS_COLUMN = "KOPS"
+# Column added when the elbow angle is solved per bike (arm_angle="back" / "awrist")
+ELBOW_COLUMN = "Elbow Angle"
+# Augmented parameter columns (augmented_parameters)
+AUGMENTED_COLUMNS = [
+    "Back Vertical Height",
+    "Head Height",
+    "Theigh Width",
+    "Leg Area",
+    "Frontal Surface Area",
+]
+# Elbow angle (degrees) used when none is given
+DEFAULT_ARM_ANGLE = 150
+# interface_points columns [hx, hy, sx, sy, cl] reordered for vectorizedangles
+ANGLE_COLUMNS = [2, 3, 0, 1, 4]
+# interface_points columns by name, and in vectorizedangles order
+INTERFACE_NAMES = ["hx", "hy", "sx", "sy", "cl"]
+ANGLE_NAMES = [INTERFACE_NAMES[i] for i in ANGLE_COLUMNS]
+# FitBatch columns (name, unit) of interface_body_calculation
+# (interface points stored in vectorizedangles order, the kernels read them as a view)
+BATCH_COLUMNS = (
+    [(name, "mm") for name in ANGLE_NAMES]
+    + [(ELBOW_COLUMN, "deg")]
+    + [(name, "deg") for name in OUTPUT_COLUMNS[:3]]
+    + [(name, "mm") for name in AUGMENTED_COLUMNS[:3]]
+    + [(name, "mm^2") for name in AUGMENTED_COLUMNS[3:]]
+    + [(OUTPUT_COLUMNS[3], "N"), (KOPS_COLUMN, "mm")]
+)
+
+
+# GLOBAL MODEL (sklearn, loaded lazily, aerodynamic_drag uses the compiled export)
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "new_formatted_model.pkl")
+
+
+@lru_cache(maxsize=None)
+def load_global_model(path=MODEL_PATH):
+    """
+    Input: OPTIONAL path to pickled model tuple
+    Output: aerodynamic drag model (sklearn regressor)
+    Unpickled once per process and path, later calls return the cached model
+    """
+    with open(path, "rb") as f:
+        return pickle.load(f)[2]
+
+
+@lru_cache(maxsize=None)
+def load_compiled_model(path=COMPILED_MODEL_PATH):
+    """
+    Input: OPTIONAL path to exported .npz (see aeromodel.py)
+    Output: CompiledAeroModel used by aerodynamic_drag
+    Falls back to compiling the pickled model if the export is missing
+    """
+    if os.path.exists(path):
+        return CompiledAeroModel.load(path)
+    return CompiledAeroModel.from_sklearn(load_global_model())
 
 
 def augmented_parameters(int_points, body):
     """
     Input:
-    array of interface points (nx5) and body dimensions (1x8)
-        int_pts = [sx, sy, hx, hy, cl]
+    array of interface points (nx5) and body dimensions (1x8 or nx8 per row)
+        int_pts = [hx, hy, sx, sy, cl]
         body = [ll, ul, tl, al, fl, aa, sw, ht]
-    Output: array of augmented parameters (nx5)
-        [back vertical height, thigh width, leg area, frontal surface area, arm height]
+    Output: dataframe of augmented parameters (nx5), AUGMENTED_COLUMNS
+        [back vertical height, head height, thigh width, leg area, frontal surface area]
 
     !! WARNING: Calculates area in (input units)^2 !!!
     !!! SX is behind BB !!! (Different from vectorizedangles.py)
     """
-    # Calculate new body for neckhead & broadcast
+    return pd.DataFrame(augmented_array(int_points, body), columns=AUGMENTED_COLUMNS)
+
+
+def augmented_array(int_points, body, out=None):
+    """
+    Input: interface points (nx5) [hx, hy, sx, sy, cl], body dimensions (1x8 or nx8 per row),
+           OPTIONAL preallocated output (nx5, e.g. a FitBatch block)
+    Output: array of augmented parameters (nx5), same as augmented_parameters
+    """
+    # Neckhead from height, body columns broadcast over the rows
     neckhead = body[:, 7] - body[:, 0] - body[:, 1] - body[:, 2]
-    new_body = np.hstack(
-        (body[0, :4], body[0, 6], neckhead)
-    )  # [ll, ul, tl, al] + [sw] + [neckhead]
-    br_new_body = np.broadcast_to(new_body, (len(int_points), 6))
+    ll = body[:, 0]
+    ul = body[:, 1]
+    back = body[:, 2]
+    arm = body[:, 3]
+    sw = body[:, 6]
+
+    hx = int_points[:, 0]
+    hy = int_points[:, 1]
+    sx = int_points[:, 2]
+    sy = int_points[:, 3]
+    cl = int_points[:, 4]
 
-    # Create joined array config
-    # [hx, hy, sx, sy, cl, ll, ul, tl, al, sw, neckhead]
-    config = np.hstack((int_points, br_new_body))
-
-    # Calculate key dimensions of interest and augmented parameters
-    additionaldata = np.zeros((len(config[:, 1]), 5))
-    for i in range(len(config)):
-        # Decompose config per row
-        hx = config[i, 0]
-        hy = config[i, 1]
-        sx = config[i, 2]
-        sy = config[i, 3]
-        cl = config[i, 4]
-        ll = config[i, 5]
-        ul = config[i, 6]
-        back = config[i, 7]
-        arm = config[i, 8]
-        sw = config[i, 9]
-        neckhead = config[i, 10]
-
-        # Calculate augmented parameters
-        Lsh = np.sqrt(
-            (sx - 0.2 + hx) ** 2 + (sy - hy) ** 2
-        )  # distance from saddle to handlebar
-        Lspl = (
-            np.sqrt((sx - 0.2) ** 2 + sy**2) + cl
-        )  # distance from saddle to pedals in farthest pos
-        # Lsps=np.sqrt((sx-0.2)**2+sy**2)-cl #distance from saddle to pedals in closest pos
-        Tsh = np.arctan(
-            (hy - sy) / (sx - 0.2 + hx)
-        )  # angle from saddle to handlebar in degrees
-        Tsp2 = np.arctan(
-            -(sy + cl) / (sx - 0.2)
-        )  # angle from saddle to lower pedal in degrees
-        Tssh = np.arccos(
-            (back**2 + Lsh**2 - arm**2) / (2 * back * Lsh)
-        )  # angle from shoulders to saddle to handle
-        # Tksp=np.arccos((ul**2+Lsps**2-ll**2)/(2*ul*Lsps)) #angle from knee to saddle to closest pedal pos
-        # Tskp=np.arccos((ul**2+ll**2-Lsps**2)/(2*ul*ll)) #angle from saddle to knee to closest pedal pos
-        Tksp2 = np.arccos(
-            (ul**2 + Lspl**2 - ll**2) / (2 * ul * Lspl)
-        )  # angle from knee to saddle to farthest pedal pos
-        # Tskp2=np.arccos((ul**2+ll**2-Lspl**2)/(2*ul*ll)) #angle from saddle to knee to farthest pedal pos
-        backverticalheight = back * np.sin(Tsh + Tssh)
-        shoulderheight = backverticalheight + sy
-        headheight = (back + neckhead) * np.sin(Tsh + Tssh)
-        armheight = shoulderheight - hx
-        theighwidth = (sw / 2 - 0.16) / 2
-        lowerkneeheight = ul * np.sin(Tksp2 + Tsp2)
-        if lowerkneeheight < sy:
-            legarea = (sy - lowerkneeheight) * (theighwidth - 0.12) + 2 * sy * 0.12
-        else:
-            legarea = 2 * sy * 0.12
-        frontalsa = (
-            armheight * 0.1
-            + shoulderheight * sw
-            + np.pi / 16
-            + 0.1 * sw * np.cos(Tsh + Tssh)
-        )
-        additionaldata[i, :] = [
-            backverticalheight,
-            headheight,
-            theighwidth,
-            legarea,
-            frontalsa,
-        ]
-    afdf = pd.DataFrame(
-        additionaldata,
-        columns=[
-            "Back Vertical Height",
-            "Head Height",
-            "Theigh Width",
-            "Leg Area",
-            "Frontal Surface Area",
-        ],
+    # Calculate augmented parameters
+    Lsh = np.sqrt(
+        (sx - 0.2 + hx) ** 2 + (sy - hy) ** 2
+    )  # distance from saddle to handlebar
+    Lspl = (
+        np.sqrt((sx - 0.2) ** 2 + sy**2) + cl
+    )  # distance from saddle to pedals in farthest pos
+    # Lsps=np.sqrt((sx-0.2)**2+sy**2)-cl #distance from saddle to pedals in closest pos
+    Tsh = np.arctan(
+        (hy - sy) / (sx - 0.2 + hx)
+    )  # angle from saddle to handlebar in degrees
+    Tsp2 = np.arctan(
+        -(sy + cl) / (sx - 0.2)
+    )  # angle from saddle to lower pedal in degrees
+    Tssh = np.arccos(
+        (back**2 + Lsh**2 - arm**2) / (2 * back * Lsh)
+    )  # angle from shoulders to saddle to handle
+    # Tksp=np.arccos((ul**2+Lsps**2-ll**2)/(2*ul*Lsps)) #angle from knee to saddle to closest pedal pos
+    # Tskp=np.arccos((ul**2+ll**2-Lsps**2)/(2*ul*ll)) #angle from saddle to knee to closest pedal pos
+    Tksp2 = np.arccos(
+        (ul**2 + Lspl**2 - ll**2) / (2 * ul * Lspl)
+    )  # angle from knee to saddle to farthest pedal pos
+    # Tskp2=np.arccos((ul**2+ll**2-Lspl**2)/(2*ul*ll)) #angle from saddle to knee to farthest pedal pos
+    backverticalheight = back * np.sin(Tsh + Tssh)
+    shoulderheight = backverticalheight + sy
+    headheight = (back + neckhead) * np.sin(Tsh + Tssh)
+    armheight = shoulderheight - hx
+    theighwidth = (sw / 2 - 0.16) / 2
+    lowerkneeheight = ul * np.sin(Tksp2 + Tsp2)
+    # Leg area branch (NaN knee height falls through to the else case)
+    legarea = np.where(
+        lowerkneeheight < sy,
+        (sy - lowerkneeheight) * (theighwidth - 0.12) + 2 * sy * 0.12,
+        2 * sy * 0.12,
+    )
+    frontalsa = (
+        armheight * 0.1
+        + shoulderheight * sw
+        + np.pi / 16
+        + 0.1 * sw * np.cos(Tsh + Tssh)
     )
-    return afdf
+    if out is None:
+        out = np.empty((len(int_points), 5))
+    out[:, 0] = backverticalheight
+    out[:, 1] = headheight
+    out[:, 2] = theighwidth
+    out[:, 3] = legarea
+    out[:, 4] = frontalsa
+    return out
 
 
 def aerodynamic_drag(int_points, body, augmented_params):
     """
-    Input: bike vector array (nx14), body vector array (1x8)
+    Input: bike vector array (nx14), body vector array (1x8 or nx8 per row)
         int_points = [hx, hy, sx, sy, cl]
         body = [LL, UL, TL, AL, FL, AA, SW, HT]
         augmented_params = [back vertical height, head height, thigh width, leg area, frontal surface area]
@@ -135,7 +185,7 @@ def aerodynamic_drag(int_points, body, augmented_params):
     # Calculate new body for neckhead & broadcast in METERS
     neckhead = body[:, 7] - body[:, 0] - body[:, 1] - body[:, 2]
     new_body = (
-        np.hstack((body[0, :4], body[0, 6], neckhead)) * 0.001
+        np.column_stack((body[:, :4], body[:, 6], neckhead)) * 0.001
     )  # [ll, ul, tl, al] + [sw] + [neckhead]
     br_new_body = np.broadcast_to(new_body, (len(int_points), 6))
 
@@ -147,118 +197,125 @@ def aerodynamic_drag(int_points, body, augmented_params):
     if np.isnan(joined_arr).any():
         raise ValueError("NaNs in input array")
 
-    # Convert to dataframe to input into model
-    input_df = pd.DataFrame(
-        joined_arr,
-        columns=[
-            "hx",
-            "hy",
-            "sx",
-            "sy",
-            "cl",
-            "ll",
-            "ul",
-            "tl",
-            "al",
-            "sw",
-            "neckhead",
-            "back vertical height",
-            "head height",
-            "thigh width",
-            "leg area",
-            "frontal surface area",
-        ],
-    )
-    pred_aero = global_model.predict(input_df)
+    # Evaluate compiled model on raw array (columns in aeromodel.AERO_FEATURES order)
+    pred_aero = load_compiled_model().predict(joined_arr)
     return pred_aero
 
 
-def bike_body_calculation(bikes, body):
+def bike_body_calculation(bikes, body, keep_invalid=False, add_kops=False, arm_angle=DEFAULT_ARM_ANGLE, use="road"):
     """
-    Input: bike vector array (nx14), body vector(1x8)
+    Input: bike vector array (nx14), body vector(1x8), OPTIONAL keep invalid rows,
+           OPTIONAL add knee over pedal spindle column, OPTIONAL elbow angle,
+           OPTIONAL usecase for the solved elbow angle
+        arm_angle: degrees (scalar or one per bike), or "back" / "awrist" to solve
+                   each bike's elbow angle for the use case optimum of that angle
+                   (inversefit.solve_elbow_angle), bikes where it is unreachable are invalid
+        use: usecase name or per bike codes (vectorizedangles.use_codes), only used
+             when arm_angle is solved
         BV = [HTx, HTy, STx, STy, CL, LL, UL, TL, AL, FL, AA, SW, HT, HB]
         Body = [LL, UL, TL, AL, FL, AA, SW, HT]
     Output: knee extension, back angle, armpit angle, aerodynamic drag (nx4)
+            invalid bikes are dropped, index is the input row of each bike
+            (keep_invalid) every input row is kept, NaN for invalid bikes
+            (add_kops) extra column KOPS_COLUMN in mm (vectorizedangles.kops)
+            (solved arm_angle) extra column ELBOW_COLUMN in degrees
     !!! UNITS: mm and degrees !!!
     !!! Positive SX is behind BB !!! (Different from vectorizedangles.py)
-    !!! LOAD MODEL IN GLOBAL FRAME TO SAVE TIME !!!
+    Aero model is loaded once per process by load_compiled_model
     """
-    # **** LOAD THIS IN WRAPPER FUNCTION ****
-    # Initializing model from pkl file
-    # model = pickle.load(open("model.pkl", "rb"))[2]
-    # model = GLOBAL_AERO_MODEL
-    # **** LOAD THIS IN WRAPPER FUNCTION ****
-
-    # Constants
-    DEFAULT_ARM_ANGLE = 150
-
     # Calculate interface points
     #   NOTE: standard offsets are in mm
     #   input and output should be treated as mm
     int_points = interface_points(bikes) 
-    int_points_df = pd.DataFrame(int_points, columns=["hx", "hy", "sx", "sy", "cl"])
+    return interface_body_calculation(int_points, body, keep_invalid, add_kops, arm_angle, use)
+
+
+def interface_body_calculation(int_points, body, keep_invalid=False, add_kops=False, arm_angle=DEFAULT_ARM_ANGLE, use="road"):
+    """
+    Input: interface points (nx5) [hx, hy, sx, sy, cl] from interface_points, body vector(1x8),
+           OPTIONAL keep invalid rows, OPTIONAL add knee over pedal spindle column,
+           OPTIONAL elbow angle and usecase (see bike_body_calculation)
+    Output: same as bike_body_calculation (bike_body_calculation after interface_points)
+    !!! UNITS: mm and degrees !!!
+    Validity first: the triangle inequality checks run on every row, the angle,
+    augmented parameter and aero stages only on the rows that pass
+    Stages read and write the columns of one FitBatch (BATCH_COLUMNS), unit
+    conversions are cached in the batch and the DataFrame is built at the end
+    """
+    n = len(int_points)
+    batch = FitBatch(BATCH_COLUMNS, n)
+    batch.set(INTERFACE_NAMES, int_points)
 
-    # Calculate ergonomic angles (nx3)
     # Broadcast body array and arm_angles for ergonomic angles calculation
-    br_arm_angles = np.ones((len(bikes), 1)) * DEFAULT_ARM_ANGLE
-    br_angles_body = np.broadcast_to(body, (len(bikes), 8))
-    out_angles = pd.DataFrame(
-        all_angles(int_points, br_angles_body, br_arm_angles),
-        columns=["Knee Extension", "Back Angle", "Armpit Angle"],
-    )
+    br_angles_body = np.broadcast_to(body, (n, 8))
+    solve_arm = isinstance(arm_angle, str)
+    if solve_arm:
+        if arm_angle not in ELBOW_TARGETS:
+            raise ValueError("arm_angle must be degrees or one of " + str(list(ELBOW_TARGETS)), arm_angle)
+        # NaN where the target is unreachable, the triangle checks then reject the row
+        arm_angle = solve_elbow_angle(batch.get(ANGLE_NAMES), br_angles_body, arm_angle, use)
+    batch.set([ELBOW_COLUMN], np.broadcast_to(np.asarray(arm_angle, dtype=float).reshape(-1, 1), (n, 1)))
 
-    # Calculate augmented parameters
-    out_aug = augmented_parameters(int_points, body)
-    out_aug = out_aug.div(1000)  # convert to m
-    out_aug[["Leg Area", "Frontal Surface Area"]] = out_aug[
-        ["Leg Area", "Frontal Surface Area"]
-    ].div(
-        1000
-    )  # convert areas to m^2
-
-    # Create NaN Masks for augmented parameters and angles
-    valid_mask = validity_mask(int_points, br_angles_body, br_arm_angles).flatten()
-    aug_nan_mask = np.isnan(out_aug.values).any(axis=1)
-    angle_nan_mask = np.isnan(out_angles.values).any(axis=1)
-    combined_nan_mask = valid_mask | aug_nan_mask | angle_nan_mask
-
-    # Remove NaN rows from interface points, augmented parameters, and angles
-    no_nan_int_points = int_points_df[~combined_nan_mask] / 1000  # convert to m
-    no_nan_aug = out_aug[~combined_nan_mask]
-    no_nan_angles = out_angles[~combined_nan_mask]
-
-    # Calculate aero drag
-    pred_aero = aerodynamic_drag(no_nan_int_points, body, no_nan_aug)[:, np.newaxis]
-
-    # Concatenate angle outputs and aerodynamic drag
-    out = np.hstack((no_nan_angles.values, pred_aero))
-    out_df = pd.DataFrame(
-        out,
-        columns=["Knee Extension", "Back Angle", "Armpit Angle", "Aerodynamic Drag"],
+    # Compact to the rows that pass the triangle inequality checks
+    mask = validity_mask(batch.get(ANGLE_NAMES), br_angles_body, batch.get([ELBOW_COLUMN]))
+    batch = batch.take(~mask[:, 0])
+
+    # Calculate ergonomic angles and augmented parameters into their columns
+    br_angles_body = np.broadcast_to(body, (len(batch), 8))
+    batch.set(OUTPUT_COLUMNS[:3], all_angles(batch.get(ANGLE_NAMES), br_angles_body, batch.get([ELBOW_COLUMN])))
+    augmented_array(batch.get(INTERFACE_NAMES), body, out=batch.block(AUGMENTED_COLUMNS))
+
+    # Remaining NaN rows (arccos domain, augmented parameters)
+    keep = ~np.isnan(batch.get(OUTPUT_COLUMNS[:3] + AUGMENTED_COLUMNS)).any(axis=1)
+    batch = batch.take(keep)
+
+    # Calculate aero drag (model inputs in m and m^2)
+    batch.set(
+        [OUTPUT_COLUMNS[3]],
+        aerodynamic_drag(batch.get(INTERFACE_NAMES, "SI"), body, batch.get(AUGMENTED_COLUMNS, "SI")),
     )
-    return out_df
-
-
-bikes_df = pd.read_csv(
-    "/Users/noahwiley/Documents/Bike UROP/MeasureML-main/Frame Datasets/bike_vector_df_with_id.csv"
-).iloc[:, 2:]
-# print("bikes df\n",bikes_df)
-int_points_global = interface_points(bikes_df.values)
-# print("int_points_global\n", int_points_global)
-LL = 19 * 25.4
-UL = 18 * 25.4
-TL = 21 * 25.4
-AL = 24 * 25.4
-FL = 5.5 * 25.4
-AA = 105
-SW = 12 * 25.4
-HT = 71 * 25.4
-body = np.array([[LL, UL, TL, AL, FL, AA, SW, HT]])
-# body = np.broadcast_to(body, (len(bikes_df), 8))
-# print("body\n",body)
-
-# #Test bike_body_calculation
-start = time.time()
-res = bike_body_calculation(bikes_df.values, body)
-tot_time = time.time() - start
-print(f"Result in {tot_time} time:\n", res)
+
+    columns = list(OUTPUT_COLUMNS)
+    if add_kops:
+        batch.set([KOPS_COLUMN], kops(batch.get(ANGLE_NAMES), np.broadcast_to(body, (len(batch), 8))))
+        columns = columns + [KOPS_COLUMN]
+    if solve_arm:
+        columns = columns + [ELBOW_COLUMN]
+
+    # DataFrame only at the output boundary, index is the input row of each valid bike
+    return batch.to_frame(columns, n if keep_invalid else None)
+
+
+# Demo dataset (structural bike vectors with 2 leading id columns)
+DEMO_CSV = "/Users/noahwiley/Documents/Bike UROP/MeasureML-main/Frame Datasets/bike_vector_df_with_id.csv"
+
+
+def demo(csv_path=DEMO_CSV):
+    """
+    Input: OPTIONAL path to bike vector csv (2 id columns then nx14 bike vectors)
+    Output: prints bike_body_calculation result and timing for the demo body
+    """
+    bikes_df = pd.read_csv(csv_path).iloc[:, 2:]
+    # print("bikes df\n",bikes_df)
+    LL = 19 * 25.4
+    UL = 18 * 25.4
+    TL = 21 * 25.4
+    AL = 24 * 25.4
+    FL = 5.5 * 25.4
+    AA = 105
+    SW = 12 * 25.4
+    HT = 71 * 25.4
+    body = np.array([[LL, UL, TL, AL, FL, AA, SW, HT]])
+
+    # #Test bike_body_calculation
+    start = time.time()
+    res = bike_body_calculation(bikes_df.values, body)
+    tot_time = time.time() - start
+    print(f"Result in {tot_time} time:\n", res)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run bike_body_calculation on a bike vector csv")
+    parser.add_argument("csv_path", nargs="?", default=DEMO_CSV)
+    args = parser.parse_args()
+    demo(args.csv_path)
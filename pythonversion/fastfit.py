@@ -0,0 +1,93 @@
+import math
+from usecases import USE_DICT
+
+####################
+# Scalar Fast Path for Single Fit Requests
+# Main Function to Call: fit_probs(bike, body, arm_angle, use)
+#
+# One bike and one body with the math module only (no NumPy arrays, no scipy)
+# Same semantics as vectorizedangles:
+#   closed form minimum knee extension angle (NaN if the pedal stroke is unreachable)
+#   back and armpit to wrist angles (NaN if the arm/torso triangle fails)
+#   prob = 2 * (1 - Phi(|value - mean| / sd)) = erfc(|value - mean| / (sd * sqrt(2)))
+#
+# bike = [SX, SY, HX, HY, CL] (positive SX is behind BB), body = [LL, UL, TL, AL, FL, AA, ...]
+# Per fit latency: python pythonversion/benchmarks.py scalar
+####################
+
+
+def _acos(x):
+    """
+    math.acos that returns NaN outside [-1, 1] (like np.arccos) instead of raising
+    """
+    if -1 <= x <= 1:
+        return math.acos(x)
+    return math.nan
+
+
+def _acos_ratio(num, den):
+    """
+    _acos(num / den), NaN for a zero denominator (np.arccos of the inf / NaN quotient)
+    """
+    if den == 0:
+        return math.nan
+    return _acos(num / den)
+
+
+def fit_angles(bike, body, arm_angle=150):
+    """
+    Input: bike [SX, SY, HX, HY, CL], body [LL, UL, TL, AL, FL, AA, ...], OPTIONAL elbow angle
+           (any sequence of floats, angles in degrees)
+    Output: tuple (min knee extension angle, back angle, armpit to wrist angle) in degrees
+            NaN for invalid geometry (same as vectorizedangles.all_angles)
+    """
+    SX, SY, HX, HY, CL = bike[0], bike[1], bike[2], bike[3], bike[4]
+    LL, UL, TL, AL, FL, AA = body[0], body[1], body[2], body[3], body[4], body[5]
+
+    #### KNEE EXTENSION ####
+    # Saddle to pedal distance at the bottom (r) and top (near) of the stroke
+    seat = math.hypot(SX, SY)
+    r = seat + CL
+    near = abs(seat - CL)
+
+    x_1 = math.sqrt(LL * LL + FL * FL - 2 * LL * FL * math.cos(math.radians(AA)))
+    alpha_4 = _acos_ratio(FL * FL - LL * LL - x_1 * x_1, -2 * LL * x_1)
+    beta = _acos_ratio(UL * UL + x_1 * x_1 - r * r, 2 * UL * x_1)
+    if abs(UL - x_1) <= near <= UL + x_1:
+        ke = math.degrees(math.pi - beta + alpha_4)
+    else:
+        ke = math.nan
+
+    #### BACK AND ARMPIT TO WRIST ####
+    # SX is stored positive behind BB
+    dx = HX + SX
+    dy = HY - SY
+    sth_dist_s = dx * dx + dy * dy
+    sth_dist = math.sqrt(sth_dist_s)
+    chord_s = 2 * (AL / 2) ** 2 * (1 - math.cos(math.radians(arm_angle)))
+
+    # Saddle at the handlebar or a zero arm chord leave the triangle degenerate (NaN)
+    tors_ang = _acos_ratio(TL * TL + sth_dist_s - chord_s, 2 * TL * sth_dist)
+    back = math.degrees(tors_ang + math.atan2(dy, dx))
+    awrist = math.degrees(_acos_ratio(TL * TL + chord_s - sth_dist_s, 2 * TL * math.sqrt(chord_s)))
+    return (ke, back, awrist)
+
+
+def prob(mean, sd, value):
+    """
+    Returns probability of value or larger given mean and sd (double sided), NaN stays NaN
+    """
+    return math.erfc(abs(value - mean) / (sd * math.sqrt(2)))
+
+
+def fit_probs(bike, body, arm_angle=150, use="road"):
+    """
+    Input: bike, body, OPTIONAL elbow angle in degrees, OPTIONAL usecase
+    Output: tuple (knee, back, armpit to wrist probabilities, combined fit score)
+            NaN for invalid geometry
+    """
+    ke, back, awrist = fit_angles(bike, body, arm_angle)
+    k_prob = prob(*USE_DICT[use]["opt_knee_angle"][:2], ke)
+    b_prob = prob(*USE_DICT[use]["opt_back_angle"][:2], back)
+    aw_prob = prob(*USE_DICT[use]["opt_awrist_angle"][:2], awrist)
+    return (k_prob, b_prob, aw_prob, k_prob * b_prob * aw_prob)
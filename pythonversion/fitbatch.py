@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+
+####################
+# Columnar Fit Batch
+# Main Class: FitBatch(columns, n)
+#
+# One preallocated float64 block (n x columns, column major so every column
+# is contiguous) carrying each column's name and unit and the SX sign
+# convention. Pipeline stages read columns (converted on request, conversions
+# cached until the column is written) and write results into their own
+# preallocated columns. A DataFrame is built only by to_frame at the output
+# boundary (see demoanalysis.interface_body_calculation)
+####################
+
+# Every unit maps to its SI unit and the scale to it (angles stay degrees, drag Newtons)
+SI_UNITS = {
+    "mm": ("m", 1e-3),
+    "in": ("m", 0.0254),
+    "m": ("m", 1.0),
+    "mm^2": ("m^2", 1e-6),
+    "in^2": ("m^2", 0.0254**2),
+    "m^2": ("m^2", 1.0),
+    "deg": ("deg", 1.0),
+    "N": ("N", 1.0),
+}
+# Column whose sign depends on the convention (positive behind or ahead of the BB)
+SX_COLUMN = "sx"
+
+
+class FitBatch:
+    """
+    Column store for one pipeline run
+        columns: list of (name, unit) pairs, unit one of SI_UNITS
+        n: number of rows (columns start as NaN)
+        rows: OPTIONAL input row of each batch row (default 0..n-1, to_frame index)
+        sx_behind: sign convention of SX_COLUMN (True: positive SX is behind the BB)
+    """
+
+    def __init__(self, columns, n, rows=None, sx_behind=True):
+        self.names = [name for name, _ in columns]
+        self.units = dict(columns)
+        for name, unit in columns:
+            if unit not in SI_UNITS:
+                raise ValueError("Unknown unit for column " + name, unit)
+        self.position = {name: i for i, name in enumerate(self.names)}
+        self.data = np.full((n, len(self.names)), np.nan, order="F")
+        self.rows = np.arange(n) if rows is None else np.asarray(rows)
+        self.sx_behind = sx_behind
+        # Columns written so far (take only gathers these)
+        self.filled = set()
+        self._cache = {}
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def column(self, name):
+        """
+        Input: column name
+        Output: (n,) contiguous read only view in the column's own unit
+        """
+        view = self.data[:, self.position[name]]
+        view.flags.writeable = False
+        return view
+
+    def block(self, names):
+        """
+        Input: adjacent column names (in column order)
+        Output: writable (n x len(names)) view for a stage to write into
+                cached conversions of these columns are dropped
+        """
+        start = self.position[names[0]]
+        if [self.position[name] for name in names] != list(range(start, start + len(names))):
+            raise ValueError("Columns are not adjacent", names)
+        self._invalidate(names)
+        self.filled.update(names)
+        return self.data[:, start:start + len(names)]
+
+    def set(self, names, values):
+        """
+        Input: column names, values (n x len(names)) or (n,) for one column, in the columns' units
+        Output: writes the values into the preallocated columns
+        """
+        values = np.asarray(values, dtype=float).reshape(len(self), len(names))
+        self._invalidate(names)
+        self.filled.update(names)
+        for i, name in enumerate(names):
+            self.data[:, self.position[name]] = values[:, i]
+
+    def get(self, names, unit=None, sx_behind=None):
+        """
+        Input: column names, OPTIONAL target unit ("SI" or a unit of the same kind as
+               every column), OPTIONAL SX sign convention for SX_COLUMN
+        Output: (n x len(names)) column major array
+                adjacent columns that need no conversion are a read only view of the block,
+                anything else is converted once and cached (read only) until one of the columns is written
+        """
+        scales = [self._scale(name, unit) for name in names]
+        if sx_behind is not None and sx_behind != self.sx_behind and SX_COLUMN in names:
+            scales[names.index(SX_COLUMN)] *= -1
+        start = self.position[names[0]]
+        if scales == [1.0] * len(names) and [self.position[name] for name in names] == list(range(start, start + len(names))):
+            view = self.data[:, start:start + len(names)]
+            view.flags.writeable = False
+            return view
+
+        key = (tuple(names), tuple(scales))
+        if key not in self._cache:
+            out = np.empty((len(self), len(names)), order="F")
+            for i, name in enumerate(names):
+                np.multiply(self.data[:, self.position[name]], scales[i], out=out[:, i])
+            # Shared by every later get of these columns, so read only like the views
+            out.flags.writeable = False
+            self._cache[key] = out
+        return self._cache[key]
+
+    def take(self, keep):
+        """
+        Input: boolean mask or row positions
+        Output: new FitBatch with only those rows, rows follow (the batch itself if a mask keeps every row)
+        Written columns are gathered one contiguous column at a time, the rest stay NaN
+        """
+        keep = np.asarray(keep)
+        if keep.dtype == bool and keep.all():
+            return self
+        index = np.flatnonzero(keep) if keep.dtype == bool else keep
+        out = FitBatch([], 0, self.rows[index], self.sx_behind)
+        out.names, out.units, out.position = self.names, self.units, self.position
+        out.data = np.empty((len(index), len(self.names)), order="F")
+        for name in self.names:
+            j = self.position[name]
+            if name in self.filled:
+                np.take(self.data[:, j], index, out=out.data[:, j])
+            else:
+                out.data[:, j] = np.nan
+        out.filled = set(self.filled)
+        return out
+
+    def to_frame(self, names, n_rows=None):
+        """
+        Input: column names, OPTIONAL number of input rows
+        Output: DataFrame of the columns in their own units, index is the input row
+                (n_rows) every input row 0..n_rows-1, NaN for rows not in the batch
+        """
+        values = self.data[:, [self.position[name] for name in names]]
+        if n_rows is None:
+            return pd.DataFrame(values, index=self.rows, columns=names)
+        full = np.full((n_rows, len(names)), np.nan)
+        full[self.rows] = values
+        return pd.DataFrame(full, columns=names)
+
+    def _scale(self, name, unit):
+        """
+        Scale from the column's unit to unit (None keeps the column's unit)
+        """
+        own = self.units[name]
+        if unit is None or unit == own:
+            return 1.0
+        si, scale = SI_UNITS[own]
+        if unit == "SI":
+            return scale
+        if SI_UNITS[unit][0] != si:
+            raise ValueError("Cannot convert column " + name + " from " + own, unit)
+        return scale / SI_UNITS[unit][1]
+
+    def _invalidate(self, names):
+        """
+        Drops cached conversions that include any of names
+        """
+        names = set(names)
+        for key in [key for key in self._cache if names.intersection(key[0])]:
+            del self._cache[key]
@@ -0,0 +1,231 @@
+import heapq
+import numpy as np
+import pandas as pd
+from usecases import USE_DICT
+from vectorizedangles import all_angles, fit_scores, prob
+
+####################
+# Catalog Fit Recommendation Index
+# Main Function to Call: FitIndex(bike_vectors).query(body, k, use, arm_angle)
+#
+# For a fixed body the three fit angles only depend on 3 bike features:
+#   r   = saddle to pedal distance at the bottom of the stroke (knee angle)
+#   d   = saddle to handlebar distance (armpit to wrist angle)
+#   phi = saddle to handlebar angle from horizontal (back angle = phi + torso offset(d))
+# The index is a KD-tree over (r, d, phi). A query computes an upper bound on
+# the fit score of every node box and visits nodes best bound first, so the
+# exact top-k is found after evaluating only bikes near the USE_DICT optima
+#
+# Bike vectors use the vectorizedangles convention [SX, SY, HX, HY, CL]
+####################
+
+# Bikes per leaf node
+DEFAULT_LEAF_SIZE = 256
+# Slack (degrees) on node bounds so rounding can never prune an exact match
+BOUND_SLACK = 1e-9
+
+
+def fit_features(bike_vectors):
+    """
+    Input: bike vectors (nx5) [SX, SY, HX, HY, CL]
+    Output: features (nx3) [r, d, phi] (length units and radians)
+    """
+    SX = bike_vectors[:, 0] * -1
+    SY = bike_vectors[:, 1]
+    HX = bike_vectors[:, 2]
+    HY = bike_vectors[:, 3]
+    CL = bike_vectors[:, 4]
+    r = np.sqrt(SX**2 + SY**2) + CL
+    d = np.sqrt((HX - SX) ** 2 + (HY - SY) ** 2)
+    phi = np.arctan2(HY - SY, HX - SX)
+    return np.column_stack((r, d, phi))
+
+
+class FitIndex:
+    """
+    KD-tree over catalog fit features
+        bike_vectors: catalog (nx5) [SX, SY, HX, HY, CL]
+        leaf_size: bikes per leaf
+    Node arrays (one entry per node):
+        lo, hi: feature bounding box (nodes x 3)
+        left, right: child node ids (-1 for leaves)
+        start, stop: leaf range into order (catalog rows sorted by leaf)
+    """
+
+    def __init__(self, bike_vectors, leaf_size=DEFAULT_LEAF_SIZE):
+        self.bike_vectors = np.ascontiguousarray(bike_vectors, dtype=float)
+        self.features = fit_features(self.bike_vectors)
+        self.leaf_size = leaf_size
+        self._build()
+
+    @classmethod
+    def from_interface_points(cls, int_points, leaf_size=DEFAULT_LEAF_SIZE):
+        """
+        Input: interface_points output (nx5) [hx, hy, sx, sy, cl], OPTIONAL leaf size
+        Output: FitIndex over the catalog (rows keep catalog order)
+        """
+        return cls(int_points[:, [2, 3, 0, 1, 4]], leaf_size)
+
+    def _build(self):
+        """
+        Builds the tree with median splits on the widest (normalized) feature
+        """
+        n = len(self.features)
+        order = np.arange(n)
+        scale = np.nanstd(self.features, axis=0) if n else np.ones(3)
+        scale[~(scale > 0)] = 1
+
+        lo, hi, left, right, start, stop = [], [], [], [], [], []
+        # stack of (node id, first, last) ranges into order
+        stack = [(0, 0, n)]
+        lo.append(None), hi.append(None), left.append(-1), right.append(-1)
+        start.append(0), stop.append(n)
+        while stack:
+            node, first, last = stack.pop()
+            feats = self.features[order[first:last]]
+            lo[node] = np.nanmin(feats, axis=0) if last > first else np.zeros(3)
+            hi[node] = np.nanmax(feats, axis=0) if last > first else np.zeros(3)
+            if last - first <= self.leaf_size:
+                continue
+
+            # Split on the widest feature at the median
+            axis = int(np.argmax((hi[node] - lo[node]) / scale))
+            mid = (last - first) // 2
+            part = np.argpartition(feats[:, axis], mid)
+            order[first:last] = order[first:last][part]
+
+            for child_first, child_last in ((first, first + mid), (first + mid, last)):
+                child = len(lo)
+                lo.append(None), hi.append(None), left.append(-1), right.append(-1)
+                start.append(child_first), stop.append(child_last)
+                stack.append((child, child_first, child_last))
+            left[node] = child - 1
+            right[node] = child
+
+        self.order = order
+        self.lo = np.array(lo)
+        self.hi = np.array(hi)
+        self.left = np.array(left)
+        self.right = np.array(right)
+        self.start = np.array(start)
+        self.stop = np.array(stop)
+
+    def node_bounds(self, body, use="road", arm_angle=150):
+        """
+        Input: body vector (1x6 or 1x8), OPTIONAL usecase, OPTIONAL elbow angle in degrees
+        Output: upper bound on the fit score of any bike in each node (nodes,)
+        """
+        LL, UL, TL, AL, FL, AA = (float(v) for v in np.ravel(body)[:6])
+        # Functional lower leg and arm chord (same as the angle kernels)
+        x_1 = np.sqrt(LL**2 + FL**2 - 2 * LL * FL * np.cos(AA * (np.pi / 180)))
+        alpha_4 = np.arccos((FL**2 - LL**2 - x_1**2) / (-2 * LL * x_1))
+        chord = np.sqrt(2 * (AL / 2) ** 2 * (1 - np.cos(arm_angle * (np.pi / 180))))
+
+        # Interval ends are clipped to the valid triangle, so clip the cosines too
+        def knee(r):
+            # Knee extension angle (degrees) at saddle to pedal distance r
+            beta = np.arccos(np.clip((UL**2 + x_1**2 - r**2) / (2 * UL * x_1), -1, 1))
+            return (np.pi - beta + alpha_4) * (180 / np.pi)
+
+        def torso(d):
+            # Torso offset from the saddle to handlebar line (radians)
+            return np.arccos(np.clip((TL**2 + d**2 - chord**2) / (2 * TL * d), -1, 1))
+
+        def awrist(d):
+            # Armpit to wrist angle (degrees)
+            cos_aw = np.clip((TL**2 + chord**2 - d**2) / (2 * TL * chord), -1, 1)
+            return np.arccos(cos_aw) * (180 / np.pi)
+
+        def deviation(a_lo, a_hi, mean):
+            # Smallest distance from mean to the interval [a_lo, a_hi]
+            return np.maximum(np.maximum(a_lo - mean, mean - a_hi) - BOUND_SLACK, 0)
+
+        with np.errstate(invalid="ignore"):
+            # Knee angle is decreasing in r on the reachable interval
+            r_lo = np.maximum(self.lo[:, 0], abs(UL - x_1))
+            r_hi = np.minimum(self.hi[:, 0], UL + x_1)
+            r_ok = r_lo <= r_hi
+            knee_dev = deviation(knee(r_hi), knee(r_lo), USE_DICT[use]["opt_knee_angle"][0])
+
+            # Armpit to wrist angle is increasing in d, torso offset peaks at sqrt(TL^2 - chord^2)
+            d_lo = np.maximum(self.lo[:, 1], abs(TL - chord))
+            d_hi = np.minimum(self.hi[:, 1], TL + chord)
+            d_ok = d_lo <= d_hi
+            aw_dev = deviation(awrist(d_lo), awrist(d_hi), USE_DICT[use]["opt_awrist_angle"][0])
+
+            peak = np.sqrt(max(TL**2 - chord**2, 0))
+            t_lo = np.minimum(torso(d_lo), torso(d_hi))
+            t_hi = np.where(
+                (d_lo <= peak) & (peak <= d_hi), torso(peak), np.maximum(torso(d_lo), torso(d_hi))
+            )
+            back_lo = (self.lo[:, 2] + t_lo) * (180 / np.pi)
+            back_hi = (self.hi[:, 2] + t_hi) * (180 / np.pi)
+            back_dev = deviation(back_lo, back_hi, USE_DICT[use]["opt_back_angle"][0])
+
+        bound = (
+            prob(0, USE_DICT[use]["opt_knee_angle"][1], knee_dev)
+            * prob(0, USE_DICT[use]["opt_back_angle"][1], back_dev)
+            * prob(0, USE_DICT[use]["opt_awrist_angle"][1], aw_dev)
+        )
+        return np.where(r_ok & d_ok & ~np.isnan(bound), bound, 0)
+
+    def score_rows(self, rows, body, use="road", arm_angle=150):
+        """
+        Input: catalog rows, body vector (1x6 or 1x8), OPTIONAL usecase, OPTIONAL elbow angle
+        Output: tuple (angles (rows x 3) in degrees, fit scores (rows,) NaN if invalid)
+        """
+        bikes = self.bike_vectors[rows]
+        bodies = np.broadcast_to(np.atleast_2d(body), (len(rows), np.size(body)))
+        angles = all_angles(bikes, bodies, np.full((len(rows), 1), float(arm_angle)))
+        return (angles, fit_scores(angles, use))
+
+    def query(self, body, k=10, use="road", arm_angle=150, ret_stats=False):
+        """
+        Input: body vector (1x6 or 1x8), OPTIONAL number of bikes, OPTIONAL usecase,
+               OPTIONAL elbow angle in degrees, OPTIONAL return search stats
+        Output: dataframe of the exact top k bikes by fit score (best first)
+                columns Row (catalog row), Fit Score, Knee Extension, Back Angle, Armpit Angle
+                invalid bikes are never returned
+                (with ret_stats) tuple (dataframe, number of bikes evaluated)
+        """
+        if k <= 0:
+            raise ValueError("k must be a positive number of bikes", k)
+        bounds = self.node_bounds(body, use, arm_angle)
+
+        # best k scores and rows so far, max-heap of nodes by bound
+        best_scores = np.empty(0)
+        best_rows = np.empty(0, dtype=int)
+        nodes = [(-bounds[0], 0)] if len(self.order) else []
+        evaluated = 0
+        while nodes:
+            neg_bound, node = heapq.heappop(nodes)
+            # Stop once no remaining node can beat the current k-th best
+            # (a zero bound can still hold valid bikes that score 0 while fewer than k are held)
+            if len(best_scores) == k and -neg_bound <= best_scores.min():
+                break
+            if self.left[node] >= 0:
+                for child in (self.left[node], self.right[node]):
+                    heapq.heappush(nodes, (-bounds[child], child))
+                continue
+
+            rows = self.order[self.start[node]:self.stop[node]]
+            _, scores = self.score_rows(rows, body, use, arm_angle)
+            evaluated += len(rows)
+            valid = ~np.isnan(scores)
+            best_scores = np.concatenate((best_scores, scores[valid]))
+            best_rows = np.concatenate((best_rows, rows[valid]))
+            if len(best_scores) > k:
+                keep = np.argpartition(-best_scores, k - 1)[:k]
+                best_scores = best_scores[keep]
+                best_rows = best_rows[keep]
+
+        rows = best_rows[np.argsort(-best_scores, kind="stable")]
+        angles, scores = self.score_rows(rows, body, use, arm_angle)
+        out_df = pd.DataFrame(
+            angles, columns=["Knee Extension", "Back Angle", "Armpit Angle"]
+        )
+        out_df.insert(0, "Fit Score", scores)
+        out_df.insert(0, "Row", rows)
+        if ret_stats:
+            return (out_df, evaluated)
+        return out_df
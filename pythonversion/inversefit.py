@@ -0,0 +1,187 @@
+import numpy as np
+from usecases import USE_ANGLES, USE_DICT, USE_TABLE
+from vectorizedangles import use_codes
+
+####################
+# Inverse Fit Solver
+# Main Function to Call: solve_fit(bodies, arm_angles, crank_lengths, use)
+#
+# Computes saddle and handlebar positions that put the knee extension, back
+# and armpit to wrist angles exactly at their USE_DICT optimal means
+# Inverts the vectorizedangles geometry with the law of cosines (no search):
+#   knee angle -> saddle to pedal distance at the bottom of the stroke
+#                 -> saddle position along the seat tube angle
+#   back + armpit to wrist angles -> handlebar position from the saddle
+# Elbow angle solver (solve_elbow_angle): for a given bike and body, the elbow
+# angle that puts the back or armpit to wrist angle at its optimum
+#
+# Output bike vectors use the vectorizedangles convention
+#   [SX, SY, HX, HY, CL] (positive SX is behind BB)
+####################
+
+# Seat tube angle (degrees) that places the saddle along a typical road seat tube
+DEFAULT_SEAT_TUBE_ANGLE = 73.5
+# Angles solve_elbow_angle can target (USE_ANGLES column in USE_TABLE)
+ELBOW_TARGETS = {
+    "back": USE_ANGLES.index("opt_back_angle"),
+    "awrist": USE_ANGLES.index("opt_awrist_angle"),
+}
+
+
+def knee_reach(bodies, knee_angles):
+    """
+    Input: body vectors (nx6 or nx8), knee extension angles (nx1) in degrees
+    Output: saddle to pedal distance (nx1) that gives the knee angle, NaN if unreachable
+    Inverse of the closed form knee angle: ke = pi - beta + alpha_4
+        beta = interior knee angle between upper leg and functional lower leg
+    """
+    LL = bodies[:, 0:1]
+    UL = bodies[:, 1:2]
+    FL = bodies[:, 4:5]
+    AA = bodies[:, 5:6] * (np.pi/180)
+
+    x_1 = np.sqrt(LL**2 + FL**2 - (2 * LL * FL * np.cos(AA)))
+    alpha_4 = np.arccos((FL**2 - LL**2 - x_1**2) / (-2 * LL * x_1))
+
+    beta = np.pi - (knee_angles * (np.pi/180) - alpha_4)
+    beta = np.where((beta >= 0) & (beta <= np.pi), beta, np.nan)
+    return np.sqrt(UL**2 + x_1**2 - 2 * UL * x_1 * np.cos(beta))
+
+
+def hand_offset(bodies, arm_angles, back_angles, awrist_angles):
+    """
+    Input: body vectors (nx6 or nx8), elbow angles, back angles, armpit to wrist angles
+           (nx1 or scalar, all in degrees)
+    Output: tuple (dx, dy) (nx1) handlebar position relative to the saddle
+    Shoulder sits TL along the back angle, the arm chord (elbow bent at arm_angle)
+    leaves the shoulder at the armpit to wrist angle
+    """
+    TL = bodies[:, 2:3]
+    AL = bodies[:, 3:4]
+    elbow = arm_angles * (np.pi/180)
+
+    # Arm chord shoulder to wrist (same as back_armpit_angles)
+    chord_s = (AL / 2) ** 2 + (AL / 2) ** 2 - 2 * (AL / 2) * (AL / 2) * np.cos(elbow)
+    chord = np.sqrt(chord_s)
+
+    # Saddle to handlebar distance, then the torso offset from that line
+    sth_dist = np.sqrt(TL**2 + chord_s - 2 * TL * chord * np.cos(awrist_angles * (np.pi/180)))
+    tors_ang = np.arccos((TL**2 + sth_dist**2 - chord_s) / (2 * TL * sth_dist))
+    sth_ang = back_angles * (np.pi/180) - tors_ang
+
+    return (sth_dist * np.cos(sth_ang), sth_dist * np.sin(sth_ang))
+
+
+def solve_fit(bodies, arm_angles, crank_lengths, use="road", seat_tube_angles=DEFAULT_SEAT_TUBE_ANGLE):
+    """
+    Input: body vectors (nx6 or nx8), elbow angles in degrees (nx1 or scalar),
+           crank lengths (nx1 or scalar, body units), OPTIONAL usecase,
+           OPTIONAL seat tube angles in degrees (nx1 or scalar)
+    Output: tuple (bike vectors (nx5) [SX, SY, HX, HY, CL], infeasible (nx3) bool)
+        infeasible columns follow all_angles: [knee, back, armpit to wrist]
+        rows with an infeasible target are NaN in the affected coordinates
+    Saddle height along the seat tube comes from the knee target, the
+    handlebar from the back and armpit to wrist targets
+    """
+    bodies = np.atleast_2d(np.asarray(bodies, dtype=float))
+    n = len(bodies)
+    arm_angles = np.broadcast_to(np.asarray(arm_angles, dtype=float).reshape(-1, 1), (n, 1))
+    CL = np.broadcast_to(np.asarray(crank_lengths, dtype=float).reshape(-1, 1), (n, 1))
+    STA = np.broadcast_to(np.asarray(seat_tube_angles, dtype=float).reshape(-1, 1), (n, 1))
+    STA = STA * (np.pi/180)
+
+    knee_target = USE_DICT[use]["opt_knee_angle"][0]
+    back_target = USE_DICT[use]["opt_back_angle"][0]
+    awrist_target = USE_DICT[use]["opt_awrist_angle"][0]
+
+    #### SADDLE ####
+    # Pedal at the bottom of the stroke is CL beyond the BB on the saddle to BB line
+    reach = knee_reach(bodies, np.full((n, 1), knee_target))
+    seat_dist = reach - CL
+
+    # Leg must also close the triangle at the top of the stroke (pedal CL towards the saddle)
+    UL = bodies[:, 1:2]
+    x_1 = np.sqrt(
+        bodies[:, 0:1]**2 + bodies[:, 4:5]**2
+        - 2 * bodies[:, 0:1] * bodies[:, 4:5] * np.cos(bodies[:, 5:6] * (np.pi/180))
+    )
+    knee_bad = ~(seat_dist > 0) | ~(np.abs(seat_dist - CL) >= np.abs(UL - x_1))
+    seat_dist = np.where(knee_bad, np.nan, seat_dist)
+
+    SX = seat_dist * np.cos(STA)
+    SY = seat_dist * np.sin(STA)
+
+    #### HANDLEBAR ####
+    dx, dy = hand_offset(bodies, arm_angles, back_target, awrist_target)
+    hand_bad = np.isnan(dx) | np.isnan(dy)
+
+    # SX is positive behind the BB, handlebar x is measured forward
+    HX = -SX + dx
+    HY = SY + dy
+
+    bike_vectors = np.hstack((SX, SY, HX, HY, CL))
+    infeasible = np.hstack((knee_bad, hand_bad, hand_bad))
+    return (bike_vectors, infeasible)
+
+
+def elbow_interval(bike_vectors, body_vectors):
+    """
+    Input: bike vectors (nx5) [SX, SY, HX, HY, CL], body vectors (nx6 or nx8)
+    Output: tuple (lowest, highest elbow angle) (nx1) in degrees where the arm/torso
+            triangle of validity_mask closes, NaN if no elbow angle does
+    Arm chord (shoulder to wrist) c = AL * sin(elbow / 2) runs from 0 (folded) to AL
+    (straight), the triangle (TL, c, saddle to handlebar) needs |d - TL| <= c <= d + TL
+    """
+    TL = body_vectors[:, 2:3]
+    AL = body_vectors[:, 3:4]
+    # SX is positive behind the BB, handlebar x is measured forward
+    sth_dist = np.sqrt((bike_vectors[:, 2:3] + bike_vectors[:, 0:1])**2 + (bike_vectors[:, 3:4] - bike_vectors[:, 1:2])**2)
+
+    c_low = np.abs(sth_dist - TL)
+    c_high = np.minimum(sth_dist + TL, AL)
+    feasible = c_low <= c_high
+    lowest = np.where(feasible, 2 * np.arcsin(np.minimum(c_low / AL, 1)) * (180/np.pi), np.nan)
+    highest = np.where(feasible, 2 * np.arcsin(c_high / AL) * (180/np.pi), np.nan)
+    return (lowest, highest)
+
+
+def solve_elbow_angle(bike_vectors, body_vectors, target="back", use="road", ret_interval=False):
+    """
+    Input: bike vectors (nx5) [SX, SY, HX, HY, CL], body vectors (nx6 or nx8),
+           OPTIONAL target angle ("back" or "awrist"), OPTIONAL usecase name or per row
+           codes (vectorizedangles.use_codes), OPTIONAL return the feasible interval
+    Output: elbow angles (nx1) in degrees that put the target angle at the use case
+            optimum, NaN where no elbow angle in the feasible interval reaches it
+            (ret_interval) tuple (elbow angles, lowest, highest) see elbow_interval
+    Inverse of back_armpit_angles with the handlebar fixed:
+        back:   torso angle = back - saddle to handlebar angle, chord from the law of cosines
+        awrist: c^2 - 2 TL cos(awrist) c + TL^2 - d^2 = 0, the straighter arm
+                (larger chord) is used when both roots fit
+    """
+    if target not in ELBOW_TARGETS:
+        raise ValueError("target must be one of " + str(list(ELBOW_TARGETS)), target)
+    n = len(bike_vectors)
+    goal = USE_TABLE[use_codes(use, n), ELBOW_TARGETS[target], 0].reshape(-1, 1) * (np.pi/180)
+
+    TL = body_vectors[:, 2:3]
+    AL = body_vectors[:, 3:4]
+    dx = bike_vectors[:, 2:3] + bike_vectors[:, 0:1]
+    dy = bike_vectors[:, 3:4] - bike_vectors[:, 1:2]
+    sth_dist_s = dx**2 + dy**2
+
+    if target == "back":
+        tors_ang = goal - np.arctan2(dy, dx)
+        tors_ang = np.where((tors_ang >= 0) & (tors_ang <= np.pi), tors_ang, np.nan)
+        chord = np.sqrt(TL**2 + sth_dist_s - 2 * TL * np.sqrt(sth_dist_s) * np.cos(tors_ang))
+    else:
+        disc = np.sqrt(sth_dist_s - (TL * np.sin(goal))**2)
+        c_plus = TL * np.cos(goal) + disc
+        c_minus = TL * np.cos(goal) - disc
+        chord = np.where(c_plus <= AL, c_plus, c_minus)
+        chord = np.where(chord > 0, chord, np.nan)
+
+    # Chord longer than the straight arm is out of reach
+    elbow = np.where(chord <= AL, 2 * np.arcsin(np.minimum(chord / AL, 1)) * (180/np.pi), np.nan)
+    if ret_interval:
+        return (elbow,) + elbow_interval(bike_vectors, body_vectors)
+    return elbow
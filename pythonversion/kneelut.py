@@ -0,0 +1,97 @@
+import numpy as np
+from inversefit import knee_reach
+
+####################
+# Knee Extension Angle Lookup Table
+# Main Function to Call: all_angles(bikes, bodies, arm_angles, lut=KneeLUT(body))
+#
+# For a fixed body the minimum knee extension angle only depends on
+#   r = saddle to pedal distance at the bottom of the stroke = hypot(SX, SY) + CL
+# so the (SX, SY, CL) grid collapses to a 1D table over r
+# Nodes are uniform in knee angle (inverted to r with inversefit.knee_reach),
+# which keeps the error small near full extension where the angle is steep in r
+####################
+
+# Table nodes per body
+DEFAULT_LUT_SIZE = 4096
+
+
+class KneeLUT:
+    """
+    Per body knee extension lookup table
+        body: body vector (1x6 or 1x8)
+        size: number of table nodes
+    Attributes:
+        r_grid: saddle to pedal distances (ascending)
+        ke_grid: knee extension angles in degrees at r_grid
+        r_min, r_max: reachable saddle to pedal distances (triangle inequality)
+        x_1, alpha_4: functional lower leg and its angle to the lower leg (radians)
+        max_error: max interpolation error in degrees (checked between nodes)
+    """
+
+    def __init__(self, body, size=DEFAULT_LUT_SIZE, r_grid=None, ke_grid=None):
+        self.body = np.asarray(body, dtype=float).reshape(1, -1)
+        LL, self.UL, _, _, FL, AA = self.body[0, :6]
+        self.x_1 = np.sqrt(LL**2 + FL**2 - 2 * LL * FL * np.cos(AA * (np.pi/180)))
+        self.alpha_4 = np.arccos((FL**2 - LL**2 - self.x_1**2) / (-2 * LL * self.x_1))
+        self.r_min = abs(self.UL - self.x_1)
+        self.r_max = self.UL + self.x_1
+
+        if r_grid is None:
+            # Knee angle runs from alpha_4 (leg straight) to 180 + alpha_4 (leg folded)
+            alpha_4 = self.alpha_4 * (180/np.pi)
+            ke_grid = np.linspace(180 + alpha_4, alpha_4, size)
+            r_grid = knee_reach(self.body, ke_grid[np.newaxis, :]).ravel()
+            # Exact ends, rounding in arccos must not shrink the reachable range
+            r_grid[0], r_grid[-1] = self.r_min, self.r_max
+        self.r_grid = np.asarray(r_grid, dtype=float)
+        self.ke_grid = np.asarray(ke_grid, dtype=float)
+        self.max_error = self._max_error()
+
+    def exact(self, r):
+        """
+        Input: saddle to pedal distances
+        Output: exact knee extension angles in degrees (NaN if unreachable)
+        """
+        beta = np.arccos((self.UL**2 + self.x_1**2 - r**2) / (2 * self.UL * self.x_1))
+        return (np.pi - beta + self.alpha_4) * (180/np.pi)
+
+    def _max_error(self):
+        """
+        Max |interpolated - exact| in degrees at the node midpoints and quarter points
+        """
+        gaps = self.r_grid[1:] - self.r_grid[:-1]
+        checks = np.concatenate([self.r_grid[:-1] + f * gaps for f in (0.25, 0.5, 0.75)])
+        with np.errstate(invalid="ignore"):
+            err = np.abs(np.interp(checks, self.r_grid, self.ke_grid) - self.exact(checks))
+        return float(np.nanmax(err))
+
+    def min_knee_extension_angle(self, bike_vectors):
+        """
+        Input: bike vectors n x 5
+        Output: n x 1 interpolated minimum knee extension angle in degrees
+                NaN where vectorizedangles.min_knee_extension_angle is NaN
+        """
+        seat = np.sqrt(bike_vectors[:, 0:1]**2 + bike_vectors[:, 1:2]**2)
+        CL = bike_vectors[:, 4:5]
+        r = seat + CL
+        # Pedal at the top of the stroke must also be reachable
+        near = np.abs(seat - CL)
+        ke = np.interp(r, self.r_grid, self.ke_grid)
+        valid = (r <= self.r_max) & (near >= self.r_min) & (near <= self.r_max)
+        return np.where(valid, ke, np.nan)
+
+    def save(self, path):
+        """
+        Saves body and table to a .npz file
+        """
+        np.savez(path, body=self.body, r_grid=self.r_grid, ke_grid=self.ke_grid)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Input: .npz path written by save
+        Output: KneeLUT
+        """
+        with np.load(path) as data:
+            return cls(data["body"], r_grid=data["r_grid"], ke_grid=data["ke_grid"])
@@ -0,0 +1,98 @@
+import os
+import numpy as np
+import pandas as pd
+from multiprocessing import get_context, shared_memory
+from demoanalysis import OUTPUT_COLUMNS, bike_body_calculation, load_compiled_model
+
+####################
+# Multi-process Bike and Body Calculation
+# Shards (body, bike range) tasks across a process pool
+#
+# The catalog is shared with workers instead of pickled per task:
+#   arrays are copied once into shared memory
+#   .npy paths are memory mapped by each worker
+# Each worker loads the aero model once (pool initializer)
+# Results come back in input order: bodies, then catalog rows
+####################
+
+# Worker process state (set by _init_worker)
+_WORKER = {}
+
+
+def _init_worker(catalog, shape, dtype, bodies):
+    """
+    Pool initializer: attach to the shared catalog and load the aero model once
+        catalog: shared memory block name, or .npy path when shape is None
+    """
+    if shape is None:
+        _WORKER["bikes"] = np.load(catalog, mmap_mode="r")
+    else:
+        # Workers share the parent's resource tracker, the parent unlinks the block
+        shm = shared_memory.SharedMemory(name=catalog)
+        _WORKER["shm"] = shm
+        _WORKER["bikes"] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _WORKER["bodies"] = bodies
+    load_compiled_model()
+
+
+def _run_shard(task):
+    """
+    Input: (body index, first row, last row + 1)
+    Output: tuple (catalog rows of valid bikes, results (kx4))
+    """
+    body_i, start, stop = task
+    bikes = np.asarray(_WORKER["bikes"][start:stop], dtype=float)
+    out_df = bike_body_calculation(bikes, _WORKER["bodies"][body_i:body_i + 1])
+    return (out_df.index.to_numpy() + start, out_df.to_numpy())
+
+
+def parallel_bike_body_calculation(bikes, bodies, workers=None, shard_rows=None):
+    """
+    Input: bike vector array (nx14) or path to .npy, body vectors (mx8),
+           OPTIONAL number of worker processes (default all cores),
+           OPTIONAL catalog rows per task
+    Output: dataframe of knee extension, back angle, armpit angle, aerodynamic drag
+            indexed by (Body, Row): body index and catalog row of each valid bike
+    !!! UNITS: mm and degrees (same as bike_body_calculation) !!!
+    """
+    bodies = np.atleast_2d(np.asarray(bodies, dtype=float))
+    workers = workers or os.cpu_count()
+
+    shm = None
+    if isinstance(bikes, (str, os.PathLike)):
+        n = len(np.load(bikes, mmap_mode="r"))
+        init_args = (os.fspath(bikes), None, None, bodies)
+    else:
+        bikes = np.ascontiguousarray(bikes, dtype=float)
+        n = len(bikes)
+        shm = shared_memory.SharedMemory(create=True, size=max(bikes.nbytes, 1))
+        np.ndarray(bikes.shape, dtype=bikes.dtype, buffer=shm.buf)[:] = bikes
+        init_args = (shm.name, bikes.shape, bikes.dtype, bodies)
+
+    # Default: ~4 tasks per worker per body for load balancing
+    shard_rows = shard_rows or max(1, -(-n // (4 * workers)))
+    tasks = [
+        (body_i, start, min(start + shard_rows, n))
+        for body_i in range(len(bodies))
+        for start in range(0, n, shard_rows)
+    ]
+
+    try:
+        with get_context().Pool(workers, initializer=_init_worker, initargs=init_args) as pool:
+            # map keeps task order, so results stay in input order
+            results = pool.map(_run_shard, tasks, chunksize=1)
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    body_index = np.concatenate(
+        [np.full(len(rows), task[0]) for task, (rows, _) in zip(tasks, results)] + [np.empty(0, int)]
+    )
+    rows = np.concatenate([rows for rows, _ in results] + [np.empty(0, int)])
+    out = np.vstack([out for _, out in results] + [np.empty((0, len(OUTPUT_COLUMNS)))])
+    return pd.DataFrame(
+        out,
+        index=pd.MultiIndex.from_arrays((body_index, rows), names=["Body", "Row"]),
+        columns=OUTPUT_COLUMNS,
+    )
@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+from vectorizedangles import all_angles, back_armpit_angles, min_knee_extension_angle
+
+####################
+# Sensitivity of Ergonomic Angles to Bike and Body Dimensions
+# Main Function to Call: angle_jacobian(bike_vectors, body_vectors, arm_angles)
+#
+# Exact partial derivatives of the all_angles outputs from the closed forms
+#   knee extension = pi - beta + alpha_4
+#       beta: knee angle in the (upper leg, functional lower leg, saddle to pedal r) triangle
+#       alpha_4: ankle offset of the functional lower leg
+#   back angle = torso offset + saddle to handlebar angle
+#   armpit to wrist = shoulder angle in the (torso, arm chord, saddle to handlebar d) triangle
+# One vectorized pass for n configurations (replaces finite differences in noise.py)
+#
+# Bike vectors use the vectorizedangles convention [SX, SY, HX, HY, CL]
+# (positive SX is behind BB), derivatives are with respect to the stored values
+####################
+
+# Dimension order of the last Jacobian axis
+JACOBIAN_DIMS = ["SX", "SY", "HX", "HY", "CL", "LL", "UL", "TL", "AL", "FL", "AA"]
+# Angle order of the middle Jacobian axis (same as all_angles)
+JACOBIAN_ANGLES = ["Knee Extension", "Back Angle", "Armpit Angle"]
+# Dimensions perturbed by noise_table: (name, "bike" or "body", column)
+NOISE_DIMS = [
+    ("Seat X", "bike", 0),
+    ("Seat Y", "bike", 1),
+    ("Handlebar X", "bike", 2),
+    ("Handlebar Y", "bike", 3),
+    ("Lower Leg", "body", 0),
+    ("Upper Leg", "body", 1),
+    ("Torso Length", "body", 2),
+    ("Arm Length", "body", 3),
+    ("Foot Length", "body", 4),
+    ("Ankle Angle", "body", 5),
+]
+NOISE_COLUMNS = ["Dimension", "Dim Value", "Noise Amt", "ke dif", "back dif", "awrist dif", "ke", "back", "awrist"]
+
+
+def d_arccos(x):
+    """
+    Derivative of arccos at x
+    """
+    return -1 / np.sqrt(1 - x**2)
+
+
+def angle_jacobian(bike_vectors, body_vectors, arm_angles, ret_angles=False):
+    """
+    Input: bike vectors (nx5), body vectors (nx6 or nx8), elbow angles (nx1) in degrees,
+           OPTIONAL return angles
+    Output: Jacobian (n x 3 x 11)
+        axis 1: knee extension, back angle, armpit to wrist angle (JACOBIAN_ANGLES)
+        axis 2: SX, SY, HX, HY, CL, LL, UL, TL, AL, FL, AA (JACOBIAN_DIMS)
+        units: degrees per length unit (degrees per degree for AA)
+        NaN where the angle is invalid (same as all_angles)
+        (with ret_angles) tuple (Jacobian, all_angles output (nx3))
+    """
+    n = len(bike_vectors)
+    jac = np.zeros((n, 3, len(JACOBIAN_DIMS)))
+    to_deg = 180 / np.pi
+
+    S0 = bike_vectors[:, 0]
+    SY = bike_vectors[:, 1]
+    HX = bike_vectors[:, 2]
+    HY = bike_vectors[:, 3]
+    CL = bike_vectors[:, 4]
+
+    LL = body_vectors[:, 0]
+    UL = body_vectors[:, 1]
+    TL = body_vectors[:, 2]
+    AL = body_vectors[:, 3]
+    FL = body_vectors[:, 4]
+    AA = body_vectors[:, 5] * (np.pi/180)
+    elbow = np.ravel(np.broadcast_to(arm_angles, (n, 1))) * (np.pi/180)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        #### KNEE EXTENSION ####
+        # Saddle to pedal distance at the bottom of the stroke
+        seat = np.sqrt(S0**2 + SY**2)
+        r = seat + CL
+        dr = {"SX": S0 / seat, "SY": SY / seat, "CL": np.ones(n)}
+
+        # Functional lower leg (foot and lower leg at the ankle angle)
+        x_1 = np.sqrt(LL**2 + FL**2 - 2 * LL * FL * np.cos(AA))
+        dx_1 = {
+            "LL": (LL - FL * np.cos(AA)) / x_1,
+            "FL": (FL - LL * np.cos(AA)) / x_1,
+            "AA": LL * FL * np.sin(AA) / x_1 * (np.pi/180),
+        }
+
+        # beta = arccos(q), q = (UL^2 + x_1^2 - r^2) / (2 UL x_1)
+        q = (UL**2 + x_1**2 - r**2) / (2 * UL * x_1)
+        dq_dr = -r / (UL * x_1)
+        dq_dx1 = 1 / UL - q / x_1
+        dbeta = d_arccos(q)
+
+        # alpha_4 = arccos(p), p = (LL^2 + x_1^2 - FL^2) / (2 LL x_1)
+        p = (LL**2 + x_1**2 - FL**2) / (2 * LL * x_1)
+        dp_dx1 = 1 / LL - p / x_1
+        dalpha_4 = d_arccos(p)
+
+        knee = {}
+        for dim, d in dr.items():
+            knee[dim] = -dbeta * dq_dr * d
+        knee["UL"] = -dbeta * (1 / x_1 - q / UL)
+        for dim, d in dx_1.items():
+            knee[dim] = (-dbeta * dq_dx1 + dalpha_4 * dp_dx1) * d
+        knee["LL"] = knee["LL"] + dalpha_4 * (1 / x_1 - p / LL)
+        knee["FL"] = knee["FL"] + dalpha_4 * (-FL / (LL * x_1))
+
+        #### BACK AND ARMPIT TO WRIST ####
+        # Saddle to handlebar vector (SX stored positive behind BB)
+        u = HX + S0
+        v = HY - SY
+        d = np.sqrt(u**2 + v**2)
+        du = {"SX": np.ones(n), "HX": np.ones(n)}
+        dv = {"SY": -np.ones(n), "HY": np.ones(n)}
+
+        # Arm chord shoulder to wrist, c^2 = (AL^2 / 2)(1 - cos elbow)
+        c_s = (AL**2 / 2) * (1 - np.cos(elbow))
+        c = np.sqrt(c_s)
+
+        # torso offset = arccos(t), t = (TL^2 + d^2 - c^2) / (2 TL d)
+        t = (TL**2 + d**2 - c_s) / (2 * TL * d)
+        dtors = d_arccos(t)
+        # armpit to wrist = arccos(w), w = (TL^2 + c^2 - d^2) / (2 TL c)
+        w = (TL**2 + c_s - d**2) / (2 * TL * c)
+        dawrist = d_arccos(w)
+
+        back = {}
+        awrist = {}
+        for dim in ("SX", "SY", "HX", "HY"):
+            d_u = du.get(dim, 0)
+            d_v = dv.get(dim, 0)
+            d_d = (u * d_u + v * d_v) / d
+            d_phi = (u * d_v - v * d_u) / d**2
+            back[dim] = dtors * (1 / TL - t / d) * d_d + d_phi
+            awrist[dim] = dawrist * (-d / (TL * c)) * d_d
+        back["TL"] = dtors * (1 / d - t / TL)
+        awrist["TL"] = dawrist * (1 / c - w / TL)
+        # dc/dAL = c / AL
+        back["AL"] = dtors * (-1 / (2 * TL * d)) * (2 * c_s / AL)
+        awrist["AL"] = dawrist * (1 / TL - w / c) * (c / AL)
+
+    for angle_i, partials in enumerate((knee, back, awrist)):
+        for dim, value in partials.items():
+            jac[:, angle_i, JACOBIAN_DIMS.index(dim)] = value * to_deg
+
+    # Invalid geometry (same NaN pattern as all_angles)
+    ke_ang = min_knee_extension_angle(bike_vectors, body_vectors)
+    b_angs, aw_angs = back_armpit_angles(bike_vectors, body_vectors, arm_angles)
+    angles = np.hstack((ke_ang, b_angs, aw_angs))
+    jac[np.isnan(angles)] = np.nan
+
+    if ret_angles:
+        return (jac, angles)
+    return jac
+
+
+def noise_table(bike_vector, body_vector, step_size, n, arm_angle=150, print_tables=False):
+    """
+    Input: bike vector (1x5) [SX, SY, HX, HY, CL], body vector (1x6 or 1x8),
+           step size, n output points, OPTIONAL elbow angle in degrees,
+           OPTIONAL print tables (same layout as noise.all_noise)
+    Output: dataframe with 2n-1 rows per dimension in NOISE_DIMS (sorted by noise)
+            columns NOISE_COLUMNS: dimension name, perturbed value, noise amount,
+            angle changes from the unperturbed fit, perturbed angles
+            NaN marks invalid geometry
+    Every perturbed configuration is evaluated in one all_angles call,
+    inputs are never modified
+    """
+    bike = np.asarray(bike_vector, dtype=float).reshape(1, -1)
+    body = np.asarray(body_vector, dtype=float).reshape(1, -1)
+    noise = step_size * np.arange(-(n - 1), n)
+    steps = len(noise)
+
+    # One block of 2n-1 rows per dimension
+    bikes = np.repeat(bike, len(NOISE_DIMS) * steps, axis=0)
+    bodies = np.repeat(body, len(NOISE_DIMS) * steps, axis=0)
+    dim_values = np.empty(len(NOISE_DIMS) * steps)
+    for i, (_, dim_type, col) in enumerate(NOISE_DIMS):
+        block = slice(i * steps, (i + 1) * steps)
+        target = bikes if dim_type == "bike" else bodies
+        target[block, col] += noise
+        dim_values[block] = target[block, col]
+
+    base = all_angles(bike, body, np.full((1, 1), float(arm_angle)))
+    angles = all_angles(bikes, bodies, np.full((len(bikes), 1), float(arm_angle)))
+
+    out_df = pd.DataFrame({
+        "Dimension": np.repeat([name for name, _, _ in NOISE_DIMS], steps),
+        "Dim Value": dim_values,
+        "Noise Amt": np.tile(noise, len(NOISE_DIMS)),
+    })
+    out_df[NOISE_COLUMNS[3:6]] = angles - base
+    out_df[NOISE_COLUMNS[6:]] = angles
+
+    if print_tables:
+        # tabulate is only needed for printing
+        from tabulate import tabulate
+
+        for name, table in out_df.groupby("Dimension", sort=False):
+            print(f"\n ***** {name} Dimension *****")
+            print(tabulate(table[NOISE_COLUMNS[1:]].to_numpy(), headers=NOISE_COLUMNS[1:]))
+    return out_df
@@ -0,0 +1,72 @@
+import os
+import numpy as np
+import pandas as pd
+from demoanalysis import OUTPUT_COLUMNS, bike_body_calculation
+
+####################
+# Streaming Bike and Body Calculation
+# Runs bike_body_calculation chunk by chunk over a catalog that does not fit
+# in memory (csv file, .npy file or array) and writes results incrementally
+#
+# Peak memory is bounded by chunk_size rows, not by the catalog size
+# Output rows keep their catalog row number as index (invalid bikes dropped)
+####################
+
+# Rows per chunk (each row costs roughly 1 kB across all pipeline stages)
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+def iter_catalog(source, chunk_size=DEFAULT_CHUNK_ROWS, skip_cols=0):
+    """
+    Input: catalog source, OPTIONAL chunk size, OPTIONAL leading columns to skip
+        source:
+            path to .csv (read with pandas in chunks)
+            path to .npy (memory mapped)
+            array (nx14 + skip_cols)
+        skip_cols: id columns before the 14 structural bike columns
+    Output: generator of (first row number, bike vector chunk (cx14))
+    """
+    if isinstance(source, (str, os.PathLike)) and str(source).endswith(".csv"):
+        start = 0
+        for chunk in pd.read_csv(source, chunksize=chunk_size):
+            bikes = chunk.iloc[:, skip_cols:].to_numpy(dtype=float)
+            yield (start, bikes)
+            start += len(bikes)
+        return
+
+    if isinstance(source, (str, os.PathLike)):
+        source = np.load(source, mmap_mode="r")
+
+    for start in range(0, len(source), chunk_size):
+        bikes = np.asarray(source[start:start + chunk_size, skip_cols:], dtype=float)
+        yield (start, bikes)
+
+
+def iter_bike_body_calculation(source, body, chunk_size=DEFAULT_CHUNK_ROWS, skip_cols=0):
+    """
+    Input: catalog source (see iter_catalog), body vector (1x8), OPTIONAL chunk size,
+           OPTIONAL leading columns to skip
+    Output: generator of bike_body_calculation dataframes, one per chunk
+            indexed by catalog row number
+    """
+    for start, bikes in iter_catalog(source, chunk_size, skip_cols):
+        out_df = bike_body_calculation(bikes, body)
+        out_df.index += start
+        yield out_df
+
+
+def stream_bike_body_calculation(source, body, out_path, chunk_size=DEFAULT_CHUNK_ROWS, skip_cols=0):
+    """
+    Input: catalog source (see iter_catalog), body vector (1x8), output csv path,
+           OPTIONAL chunk size, OPTIONAL leading columns to skip
+    Output: writes results to out_path chunk by chunk (index column "Row")
+            returns number of valid rows written
+    """
+    # Header first so an all invalid catalog still produces a readable csv
+    pd.DataFrame(columns=OUTPUT_COLUMNS).rename_axis("Row").to_csv(out_path)
+
+    n_written = 0
+    for out_df in iter_bike_body_calculation(source, body, chunk_size, skip_cols):
+        out_df.rename_axis("Row").to_csv(out_path, mode="a", header=False)
+        n_written += len(out_df)
+    return n_written
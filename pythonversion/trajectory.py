@@ -0,0 +1,102 @@
+import numpy as np
+from vectorizedangles import SWEEP_TEMPORARIES, back_armpit_angles, knee_extension_angle
+
+####################
+# Pedal Stroke Trajectories
+# Main Function to Call: iter_pedal_trajectories(bike_vectors, body_vectors)
+#
+# Samples the leg over a crank angle grid with vectorizedangles.knee_extension_angle
+# and yields float32 (rows x crank angles x channels) chunks sized to a memory
+# budget, so large batches never exist in full
+#
+# Positions are in bike units with origin at the BB, x forward, y up
+# (hip x = -SX, SX is stored positive behind BB)
+####################
+
+# Output channels (last axis)
+TRAJECTORY_CHANNELS = [
+    "Hip X", "Hip Y",
+    "Knee X", "Knee Y",
+    "Ankle X", "Ankle Y",
+    "Pedal X", "Pedal Y",
+    "Knee Angle",  # knee extension angle (degrees)
+    "Hip Angle",  # torso to thigh angle (degrees)
+    "Alpha 2",  # thigh angle below horizontal (degrees, used by kops)
+]
+# Crank angles (degrees) sampled by default
+DEFAULT_TRAJECTORY_ANGLES = np.arange(0, 360, 5)
+# Memory budget (bytes) per chunk (temporaries and output)
+DEFAULT_TRAJECTORY_BYTES = 64 * 1024**2
+
+
+def pedal_stroke(bike_vectors, body_vectors, arm_angles, crank_angles):
+    """
+    Input: bike vectors (nx5), body vectors (nx6 or nx8), elbow angles (nx1) in degrees,
+           crank angles (1xk) in degrees
+    Output: trajectories (n x k x channels) float64 in TRAJECTORY_CHANNELS order
+            NaN where the leg cannot reach the pedal
+    """
+    n = len(bike_vectors)
+    k = crank_angles.shape[1]
+    out = np.empty((n, k, len(TRAJECTORY_CHANNELS)))
+
+    UL = body_vectors[:, 1:2]
+    LL = body_vectors[:, 0:1]
+    hip_x = bike_vectors[:, 0:1] * -1
+    hip_y = bike_vectors[:, 1:2]
+    CL = bike_vectors[:, 4:5]
+
+    # Thigh angle and knee extension angle from the kernel (mirrored y)
+    alpha_2 = knee_extension_angle(bike_vectors, body_vectors, crank_angles, ret_a2=True)
+    knee_ext = knee_extension_angle(bike_vectors, body_vectors, crank_angles) * (np.pi/180)
+
+    out[:, :, 0] = hip_x
+    out[:, :, 1] = hip_y
+    out[:, :, 2] = hip_x + UL * np.cos(alpha_2)
+    out[:, :, 3] = hip_y - UL * np.sin(alpha_2)
+    # Lower leg leaves the knee turned by the knee extension angle from the thigh line
+    out[:, :, 4] = out[:, :, 2] + LL * np.cos(alpha_2 + knee_ext)
+    out[:, :, 5] = out[:, :, 3] - LL * np.sin(alpha_2 + knee_ext)
+    out[:, :, 6] = CL * np.cos(crank_angles * (np.pi/180))
+    out[:, :, 7] = CL * np.sin(crank_angles * (np.pi/180))
+    out[:, :, 8] = knee_ext * (180/np.pi)
+
+    # Torso leaves the hip at the back angle, thigh points alpha_2 below horizontal
+    back, _ = back_armpit_angles(bike_vectors, body_vectors, arm_angles)
+    out[:, :, 9] = back + alpha_2 * (180/np.pi)
+    out[:, :, 10] = alpha_2 * (180/np.pi)
+
+    # Invalid leg geometry invalidates every channel of that sample
+    out[np.isnan(knee_ext)] = np.nan
+    return out
+
+
+def iter_pedal_trajectories(
+    bike_vectors,
+    body_vectors,
+    arm_angles=150,
+    crank_angles=DEFAULT_TRAJECTORY_ANGLES,
+    max_bytes=DEFAULT_TRAJECTORY_BYTES,
+):
+    """
+    Input: bike vectors (nx5), body vectors (nx6 / nx8, or 1 row for all bikes),
+           OPTIONAL elbow angles in degrees (nx1 or scalar), OPTIONAL crank angles (k,) in degrees,
+           OPTIONAL memory budget in bytes per chunk
+    Output: generator of (first row, trajectories (rows x k x channels) float32)
+            channels follow TRAJECTORY_CHANNELS
+    """
+    crank_angles = np.asarray(crank_angles, dtype=float).reshape(1, -1)
+    n = len(bike_vectors)
+    k = crank_angles.shape[1]
+    body_vectors = np.broadcast_to(body_vectors, (n, np.shape(body_vectors)[-1]))
+    arm_angles = np.broadcast_to(np.asarray(arm_angles, dtype=float).reshape(-1, 1), (n, 1))
+
+    # Rows per chunk: kernel temporaries plus float64 and float32 outputs
+    row_bytes = k * (SWEEP_TEMPORARIES * 8 + len(TRAJECTORY_CHANNELS) * 12)
+    chunk = max(1, int(max_bytes // row_bytes))
+
+    for start in range(0, n, chunk):
+        stop = min(start + chunk, n)
+        bikes = np.asarray(bike_vectors[start:stop], dtype=float)
+        traj = pedal_stroke(bikes, body_vectors[start:stop], arm_angles[start:stop], crank_angles)
+        yield (start, traj.astype(np.float32))
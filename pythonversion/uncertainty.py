@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+from vectorizedangles import all_angles, angle_probs, use_codes
+
+####################
+# Monte Carlo Uncertainty of Fit Angles and Scores
+# Main Function to Call: monte_carlo_fit(bike_vector, body_vector, body_errors)
+#
+# Body dimensions from poseprediction.calculation carry measurement error
+# Samples body vectors from per-dimension error distributions, evaluates
+# them through the vectorized angle kernels in chunks and returns quantiles
+# of each angle, each angle_probs probability and the combined fit score
+#
+# Bike vectors use the vectorizedangles convention [SX, SY, HX, HY, CL]
+####################
+
+DEFAULT_MC_SAMPLES = 100_000
+# Samples per kernel call (each sample costs roughly 1 kB of temporaries)
+DEFAULT_MC_CHUNK = 50_000
+DEFAULT_QUANTILES = (0.05, 0.5, 0.95)
+MC_COLUMNS = [
+    "Knee Extension", "Back Angle", "Armpit Angle",
+    "Knee Prob", "Back Prob", "Armpit Prob", "Fit Score",
+]
+# Columns with the closed hip angle (hip=True)
+MC_HIP_COLUMNS = [
+    "Knee Extension", "Back Angle", "Armpit Angle", "Hip Angle",
+    "Knee Prob", "Back Prob", "Armpit Prob", "Hip Prob", "Fit Score",
+]
+# Supported error distributions, scale is the standard deviation
+ERROR_DISTS = ("normal", "uniform")
+
+
+def sample_bodies(body_vector, body_errors, size, error_dists="normal", rng=None):
+    """
+    Input: body vector (1x6 or 1x8), per-dimension error scales (6,) or scalar,
+           number of samples, OPTIONAL distribution name or one per dimension,
+           OPTIONAL numpy Generator
+        error scales are standard deviations in body units (degrees for AA)
+        "uniform" draws from +- sqrt(3) * scale (same standard deviation)
+    Output: sampled body vectors (size x body columns), extra columns unchanged
+    """
+    rng = np.random.default_rng(rng)
+    body = np.asarray(body_vector, dtype=float).reshape(1, -1)
+    scales = np.broadcast_to(np.asarray(body_errors, dtype=float), (6,))
+    dists = [error_dists] * 6 if isinstance(error_dists, str) else list(error_dists)
+    if len(dists) != 6 or any(dist not in ERROR_DISTS for dist in dists):
+        raise ValueError("error_dists must be one of or 6 of " + str(ERROR_DISTS), error_dists)
+
+    bodies = np.repeat(body, size, axis=0)
+    for i, (dist, scale) in enumerate(zip(dists, scales)):
+        if scale == 0:
+            continue
+        if dist == "normal":
+            bodies[:, i] += rng.normal(0, scale, size)
+        else:
+            bodies[:, i] += rng.uniform(-np.sqrt(3) * scale, np.sqrt(3) * scale, size)
+    return bodies
+
+
+def monte_carlo_fit(
+    bike_vector,
+    body_vector,
+    body_errors,
+    arm_angle=150,
+    use="road",
+    samples=DEFAULT_MC_SAMPLES,
+    quantiles=DEFAULT_QUANTILES,
+    error_dists="normal",
+    chunk_size=DEFAULT_MC_CHUNK,
+    seed=None,
+    hip=False,
+):
+    """
+    Input: bike vector (1x5), body vector (1x6 or 1x8), per-dimension error scales (6,) or scalar,
+           OPTIONAL elbow angle in degrees, OPTIONAL usecase, OPTIONAL number of samples,
+           OPTIONAL quantiles, OPTIONAL error distributions (see sample_bodies),
+           OPTIONAL samples per chunk, OPTIONAL random seed, OPTIONAL closed hip angle
+        use: usecase name, or per sample USE_CODES integers (or names), see use_codes
+    Output: dataframe of quantiles (rows) of MC_COLUMNS (MC_HIP_COLUMNS with hip):
+            angles in degrees, the angle_probs probabilities and the combined fit score
+            invalid samples (NaN geometry) are left out of the quantiles,
+            out_df.attrs["valid_fraction"] is the fraction of valid samples
+    """
+    rng = np.random.default_rng(seed)
+    bike = np.asarray(bike_vector, dtype=float).reshape(1, -1)
+    codes = use_codes(use, samples)
+    columns = MC_HIP_COLUMNS if hip else MC_COLUMNS
+    n_angles = (len(columns) - 1) // 2
+
+    out = np.empty((samples, len(columns)))
+    for start in range(0, samples, chunk_size):
+        stop = min(start + chunk_size, samples)
+        bodies = sample_bodies(body_vector, body_errors, stop - start, error_dists, rng)
+        bikes = np.broadcast_to(bike, (stop - start, bike.shape[1]))
+        arm_angles = np.full((stop - start, 1), float(arm_angle))
+
+        with np.errstate(invalid="ignore"):
+            angles = all_angles(bikes, bodies, arm_angles, hip=hip)
+        out[start:stop, :n_angles] = angles
+        out[start:stop, n_angles:] = angle_probs(angles, codes[start:stop], combined=True)
+
+    valid = ~np.isnan(out).any(axis=1)
+    if valid.any():
+        table = np.quantile(out[valid], quantiles, axis=0)
+    else:
+        table = np.full((len(quantiles), len(columns)), np.nan)
+    out_df = pd.DataFrame(table, index=pd.Index(quantiles, name="Quantile"), columns=columns)
+    out_df.attrs["valid_fraction"] = valid.mean() if samples else np.nan
+    return out_df
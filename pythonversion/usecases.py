@@ -1,3 +1,4 @@
+import numpy as np
 # dict of dictionaries maping use cases to their respective body angles and variations
 USE_DICT = {
     "road": {
@@ -5,17 +6,31 @@ USE_DICT = {
         "opt_back_angle": (45, 5),
         "opt_awrist_angle": (90, 5),
         "opt_ankle_angle": (100.0, 5.0),
+        "opt_hip_angle_closed": (60, 5),
     },
     "mtb": {
         "opt_knee_angle": (37.5, 10),
         "opt_back_angle": (50, 5),
         "opt_awrist_angle": (90, 5),
         "opt_ankle_angle": (100.0, 5.0),
+        "opt_hip_angle_closed": (60, 5),
     },
     "commute": {
         "opt_knee_angle": (37.5, 10),
         "opt_back_angle": (52, 5),
         "opt_awrist_angle": (85, 5),
         "opt_ankle_angle": (100.0, 5.0),
+        "opt_hip_angle_closed": (60, 5),
     },
 }
+
+
+# USE_DICT compiled for vectorized scoring (vectorizedangles.prob_dists)
+# Angles scored per row, column order of USE_TABLE (all_angles order, hip with hip=True)
+USE_ANGLES = ["opt_knee_angle", "opt_back_angle", "opt_awrist_angle", "opt_hip_angle_closed"]
+# Integer code of each use case, row order of USE_TABLE
+USE_CODES = {use: code for code, use in enumerate(USE_DICT)}
+# (use case x angle x {mean, sd})
+USE_TABLE = np.array(
+    [[USE_DICT[use][angle][:2] for angle in USE_ANGLES] for use in USE_DICT], dtype=float
+)
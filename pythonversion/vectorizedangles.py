@@ -1,6 +1,5 @@
 import numpy as np
-from scipy.stats import norm
-from usecases import USE_DICT
+from usecases import USE_CODES, USE_TABLE
 # #####
 # Bike Ergonomic Angle Fit Calculator
 # Calculates body angles given bike and body measurements
@@ -25,19 +24,16 @@ def rad_to_d(rad):
     """
     return rad.astype(float) * (180 / np.pi)
 
-def validity_mask(bikes, bodies, arm_angle):
+def triangle_checks(bikes, bodies, arm_angle):
     """
     Input: bikes, bodies, arm_angles matricies n x 5, n x 8, nx1
-    Output: n x 1 True/False mask for valid/invalid
-    TRUE = Violation
-    FALSE = NO violation
-    Checks for triangle inequality for:
-        Leg
-        Arm/torso
+    Output: tuple (arm/torso ok, leg ok) n x 1 True/False
+    TRUE = triangle inequality holds
     """
     ### Mask invalid arm/torso combos ###
     # Straight line distance between saddle position and handlebar position
-    bike_reach = np.sqrt(np.square(-bikes[:, 0:1] - bikes[:,3:4]) + np.square(bikes[:, 1:2] - bikes[:, 4:5]))
+    # (SX is stored positive behind BB, handlebar x is measured forward)
+    bike_reach = np.sqrt(np.square(bikes[:, 2:3] + bikes[:, 0:1]) + np.square(bikes[:, 3:4] - bikes[:, 1:2]))
     # Armlength considering arm bent at elbow
     functional_arms = np.sqrt( np.square(bodies[:, 3:4]/2) + np.square(bodies[:, 3:4]/2) - 2 * np.square(bodies[:, 3:4]/2) * np.cos(deg_to_r(arm_angle)))
     # Mask where sum of any 2 sides are greater than 3rd side for all side combos
@@ -57,13 +53,88 @@ def validity_mask(bikes, bodies, arm_angle):
     # Mask where sum of any 2 sides are greater than 3rd side for all side combos
     mask_lower = (funcitonal_low_leg + bodies[:, 1:2] > straightline_seat) & (funcitonal_low_leg + straightline_seat > bodies[:, 1:2]) & (bodies[:, 1:2] + straightline_seat > funcitonal_low_leg)
 
+    return (mask_upper, mask_lower)
+
+
+def validity_mask(bikes, bodies, arm_angle):
+    """
+    Input: bikes, bodies, arm_angles matricies n x 5, n x 8, nx1
+    Output: n x 1 True/False mask for valid/invalid
+    TRUE = Violation
+    FALSE = NO violation
+    Checks for triangle inequality for:
+        Leg
+        Arm/torso
+    """
+    mask_upper, mask_lower = triangle_checks(bikes, bodies, arm_angle)
+
     #Combine and return masks
     return ~(np.logical_and(mask_upper, mask_lower))
 
 
+########################################
+# Failure Diagnostics (uint8 bitmask) #
+########################################
+# One bit per failed constraint, 0 = valid row
+FAIL_LEG = 1  # leg triangle inequality (validity_mask)
+FAIL_ARM_TORSO = 2  # arm/torso triangle inequality (validity_mask)
+FAIL_ALPHA_1 = 4  # arccos domain at alpha_1 (pedal out of reach over the stroke)
+FAIL_ALPHA_4 = 8  # arccos domain at alpha_4 (foot/lower leg/ankle angle)
+FAIL_TORSO = 16  # torso angle / armpit to wrist arccos domain
+FAILURE_NAMES = {
+    FAIL_LEG: "leg triangle",
+    FAIL_ARM_TORSO: "arm/torso triangle",
+    FAIL_ALPHA_1: "alpha_1 arccos domain",
+    FAIL_ALPHA_4: "alpha_4 arccos domain",
+    FAIL_TORSO: "torso angle",
+}
+
+
+def failure_flags(bikes, bodies, arm_angle, angles):
+    """
+    Input: bikes, bodies, arm_angles matricies n x 5, n x 8, nx1, all_angles output n x 3
+    Output: n x 1 uint8 bitmask of failed constraints (FAIL_* bits), 0 = valid
+    Reuses the computed angles, only the triangle checks are added
+    """
+    mask_upper, mask_lower = triangle_checks(bikes, bodies, arm_angle)
+
+    # alpha_4 only depends on the body
+    LL = bodies[:, 0:1]
+    FL = bodies[:, 4:5]
+    x_1 = np.sqrt(LL**2 + FL**2 - 2 * LL * FL * np.cos(bodies[:, 5:6] * (np.pi/180)))
+    alpha_4_bad = ~(np.abs((FL**2 - LL**2 - x_1**2) / (-2 * LL * x_1)) <= 1)
+
+    knee_bad = np.isnan(angles[:, 0:1])
+    torso_bad = np.isnan(angles[:, 1:2]) | np.isnan(angles[:, 2:3])
+
+    flags = np.zeros((len(angles), 1), dtype=np.uint8)
+    flags |= np.where(mask_lower, 0, FAIL_LEG).astype(np.uint8)
+    flags |= np.where(mask_upper, 0, FAIL_ARM_TORSO).astype(np.uint8)
+    flags |= np.where(knee_bad & ~alpha_4_bad, FAIL_ALPHA_1, 0).astype(np.uint8)
+    flags |= np.where(alpha_4_bad, FAIL_ALPHA_4, 0).astype(np.uint8)
+    flags |= np.where(torso_bad, FAIL_TORSO, 0).astype(np.uint8)
+    return flags
+
+
+def failure_reasons(flags):
+    """
+    Input: uint8 bitmask from failure_flags (any shape)
+    Output: list of lists of FAILURE_NAMES per row (empty list = valid)
+    """
+    return [
+        [name for bit, name in FAILURE_NAMES.items() if flag & bit]
+        for flag in np.ravel(flags)
+    ]
+
+
 ###################################
 # FUNCTIONS FOR CALCUATING ANGLES #
 ###################################
+# Memory budget (bytes) for n x k crank angle sweeps
+DEFAULT_SWEEP_BYTES = 64 * 1024**2
+# Number of live n x k float64 arrays inside knee_extension_angle
+SWEEP_TEMPORARIES = 12
+
 def knee_extension_angle(bike_vectors, body_vectors, CA, ret_a2=False):
     """
     Input:
@@ -196,24 +267,192 @@ def back_armpit_angles(bike_vectors, body_vectors, elbow_angles):
 
 
 
-def all_angles(bike_vectors, body_vectors, arm_angles):
+def kops(bike_vectors, body_vectors):
+    """
+    Input: bike vectors n x 5, body vectors n x 6 (or n x 8)
+    Output: n x 1 knee over pedal spindle offset with the crank at 3 o'clock
+            (horizontal knee position minus pedal spindle position, positive = knee ahead)
+            NaN if not valid coords
+    Vectorized kneeoverpedal.kops
+    """
+    alpha_2 = knee_extension_angle(bike_vectors, body_vectors, np.zeros((len(bike_vectors), 1)), ret_a2=True)
+    upper_leg = body_vectors[:, 1:2]
+    seat_x = bike_vectors[:, 0:1] * -1
+    crank_len = bike_vectors[:, 4:5]
+    return seat_x + upper_leg * np.cos(alpha_2) - crank_len
+
+
+def crank_extrema(bike_vectors):
+    """
+    Input: bike vectors n x 5
+    Output: tuple (far crank angle, near crank angle) n x 1 in DEGREES
+        far: pedal furthest from the saddle (leg most extended)
+        near: pedal closest to the saddle (leg most flexed)
+    The pedal sits on a circle of radius CL around the bottom bracket, so the
+    saddle to pedal distance is largest on the line from the saddle through
+    the bottom bracket and smallest on the same line on the saddle side.
+    """
+    SX = bike_vectors[:, 0:1] * -1
+    SY = bike_vectors[:, 1:2]
+    far_ca = np.arctan2(-SY, -SX) * (180/np.pi)
+    near_ca = np.arctan2(SY, SX) * (180/np.pi)
+    return (far_ca, near_ca)
+
+
+def min_knee_extension_angle(bike_vectors, body_vectors):
+    """
+    Input: bike vectors n x 5, body vectors n x 6 (or n x 8)
+    Output: n x 1 minimum knee extension angle over the pedal stroke in degrees
+            NaN if the leg cannot complete a full rotation of the cranks
+
+    The knee extension angle only depends on the saddle to pedal distance and
+    shrinks as that distance grows, so the minimum is at the far crank angle
+    from crank_extrema. The near crank angle is evaluated to check that the
+    leg can also reach the top of the stroke.
+
+    Tolerance vs sweep_min_knee_extension_angle (1 degree crank steps):
+        closed form is never larger than the sweep and differs by the sweep's
+        sampling error only (< 0.2 degrees, largest near full leg extension)
+        rows where the sweep steps over an unreachable far point are NaN here
+    """
+    far_ca, near_ca = crank_extrema(bike_vectors)
+    ke_far = knee_extension_angle(bike_vectors, body_vectors, far_ca)
+    ke_near = knee_extension_angle(bike_vectors, body_vectors, near_ca)
+
+    # NaN at the top of the stroke invalidates the whole rotation
+    return np.where(np.isnan(ke_near), np.nan, ke_far)
+
+
+def min_thigh_angle(bike_vectors, body_vectors):
+    """
+    Input: bike vectors n x 5, body vectors n x 6 (or n x 8)
+    Output: n x 1 minimum over the pedal stroke of alpha_2 (thigh angle below
+            horizontal, knee_extension_angle(..., ret_a2=True)) in radians
+            NaN if not valid coords
+
+    alpha_2 is stationary when the knee is, which happens when the functional
+    lower leg lines up with the crank. At the minimum (knee highest) the knee is
+    x_1 + CL from the bottom bracket, so alpha_2 is the kernel's triangle with the
+    pedal moved to the bottom bracket and the lower leg lengthened by CL
+    Agrees with a 0.05 degree crank angle sweep of alpha_2 to its sampling error
+    """
+    LL = body_vectors[:, 0:1]
+    UL = body_vectors[:, 1:2]
+    FL = body_vectors[:, 4:5]
+    AA = body_vectors[:, 5:6] * (np.pi/180)
+
+    SX = bike_vectors[:, 0:1] * -1
+    SY = bike_vectors[:, 1:2]
+    CL = bike_vectors[:, 4:5]
+
+    x_1 = np.sqrt(LL**2 + FL**2 - (2 * LL * FL * np.cos(AA)))
+    seat = np.sqrt(SX**2 + SY**2)
+    alpha_1 = np.arccos((UL**2 + seat**2 - (x_1 + CL)**2) / (2 * UL * seat))
+    return np.arctan2(SY, -SX) - alpha_1
+
+
+def closed_hip_angle(back_angles, min_a2):
+    """
+    Input: back angles n x 1 in degrees, minimum alpha_2 n x 1 in radians (min_thigh_angle)
+    Output: n x 1 closed hip angle (smallest torso to thigh angle over the stroke) in degrees
+    Torso leaves the hip at the back angle above horizontal, the thigh points
+    alpha_2 below horizontal, the back angle does not change with the crank
+    """
+    return back_angles + rad_to_d(min_a2)
+
+
+def knee_extension_sweep(bike_vectors, body_vectors, crank_angles, reduce=None, max_bytes=DEFAULT_SWEEP_BYTES):
+    """
+    Input: bike vectors n x 5, body vectors n x 6 (or n x 8),
+           crank angles (k,) in DEGREES (k >= 1), OPTIONAL reduction, OPTIONAL memory budget
+        reduce:
+            None -> n x k knee extension angles
+            "min" / "max" -> n x 1 min / max over the crank angles
+            "argmin" -> n x 1 index into crank_angles of the min (-1 if any NaN)
+        max_bytes:
+            budget for the n x k temporaries, rows are chunked to stay under it
+    Output: knee extension angles in degrees, NaN propagates like all_angles
+
+    Each chunk is evaluated as one (rows x k) broadcast of knee_extension_angle
+    """
+    if reduce not in (None, "min", "max", "argmin"):
+        raise ValueError("reduce must be None, 'min', 'max' or 'argmin'", reduce)
+
+    crank_angles = np.asarray(crank_angles, dtype=float).reshape(1, -1)
+    n = len(bike_vectors)
+    k = crank_angles.shape[1]
+    if k < 1:
+        raise ValueError("crank_angles must hold at least one crank angle", k)
+
+    # Rows per chunk so that every live n x k float64 temporary fits the budget
+    chunk = max(1, int(max_bytes // (SWEEP_TEMPORARIES * 8 * k)))
+
+    if reduce is None:
+        out = np.empty((n, k))
+    elif reduce == "argmin":
+        out = np.empty((n, 1), dtype=np.intp)
+    else:
+        out = np.empty((n, 1))
+
+    for start in range(0, n, chunk):
+        stop = min(start + chunk, n)
+        ke = knee_extension_angle(bike_vectors[start:stop], body_vectors[start:stop], crank_angles)
+        if reduce is None:
+            out[start:stop] = ke
+        elif reduce == "min":
+            out[start:stop, 0] = np.min(ke, axis=1)
+        elif reduce == "max":
+            out[start:stop, 0] = np.max(ke, axis=1)
+        else:
+            arg = np.argmin(np.where(np.isnan(ke), np.inf, ke), axis=1)
+            arg[np.isnan(ke).any(axis=1)] = -1
+            out[start:stop, 0] = arg
+    return out
+
+
+def sweep_min_knee_extension_angle(bike_vectors, body_vectors):
+    """
+    Input: bike vectors n x 5, body vectors n x 6 (or n x 8)
+    Output: n x 1 minimum knee extension angle in degrees
+    Reference brute force sweep (crank angle 90 and 180-359 in 1 degree steps)
+    kept for checking min_knee_extension_angle
+    """
+    crank_angles = np.hstack(([90], np.arange(180, 360)))
+    return knee_extension_sweep(bike_vectors, body_vectors, crank_angles, reduce="min")
+
+
+def all_angles(bike_vectors, body_vectors, arm_angles, lut=None, ret_flags=False, hip=False):
     """
-    Input: bike, body, arm angle (at elbow) in degrees
+    Input: bike, body, arm angle (at elbow) in degrees, OPTIONAL knee lookup table,
+           OPTIONAL return failure flags, OPTIONAL closed hip angle
+        lut: kneelut.KneeLUT built for the (single) body in body_vectors,
+             knee extension is interpolated instead of computed
+             (error at most lut.max_error degrees), ValueError if any row
+             of body_vectors is not lut.body
+        hip: adds a 4th column, closed hip angle (closed_hip_angle) from the
+             back angle and the closed form min_thigh_angle
     Output: tuple (min_ke angle, back angle, awrist angle) in degrees
+            (with ret_flags) tuple (angles, n x 1 uint8 failure_flags bitmask)
     """
-    #Min knee extension angle over sweep 0-2pi np.maximum propogates nans
-    cur_min = knee_extension_angle(bike_vectors, body_vectors, 90)
-    
-    for test_ca in range(180,360):
-        cur_test = knee_extension_angle(bike_vectors, body_vectors, test_ca)
-        cur_min = np.minimum(cur_min, cur_test)
-        #print(f"Testing {test_ca}: cur_test = {cur_test} cur_min = {cur_min}")
-    ke_ang = cur_min
+    # Min knee extension angle over the pedal stroke (closed form or table)
+    if lut is None:
+        ke_ang = min_knee_extension_angle(bike_vectors, body_vectors)
+    else:
+        # The table only holds one rider's knee angles
+        if (body_vectors[:, :6] != lut.body[:, :6]).any():
+            raise ValueError("lut was built for a different body", lut.body)
+        ke_ang = lut.min_knee_extension_angle(bike_vectors)
 
     # back angle, armpit to wrist angle
     b_angs, aw_angs = back_armpit_angles(bike_vectors, body_vectors, arm_angles)
 
     out = np.hstack((ke_ang, b_angs, aw_angs))
+    if hip:
+        # NaN knee (leg cannot complete the stroke) invalidates the hip angle too
+        hip_angs = np.where(np.isnan(ke_ang), np.nan, closed_hip_angle(b_angs, min_thigh_angle(bike_vectors, body_vectors)))
+        out = np.hstack((out, hip_angs))
+    if ret_flags:
+        return (out, failure_flags(bike_vectors, body_vectors, arm_angles, out))
     return out
 
 ############################
@@ -222,41 +461,223 @@ def all_angles(bike_vectors, body_vectors, arm_angles):
 # Calculates probability of a certain angle given reccomended angle and standard deviation
 # in usecases.py
 
+def erfc(x):
+    """
+    Complementary error function for x >= 0 (elementwise, no scipy)
+    Chebyshev fit from Numerical Recipes (erfcc), fractional error < 1.2e-7
+    (clamped to 1, the fit gives 1.00000003 at x = 0)
+    """
+    x = np.asarray(x, dtype=float)
+    t = 1 / (1 + 0.5 * x)
+    # Horner in place, one temporary for the whole polynomial
+    poly = np.full_like(t, 0.17087277)
+    for coef in (-0.82215223, 1.48851587, -1.13520398, 0.27886807,
+                 -0.18628806, 0.09678418, 0.37409196, 1.00002368, -1.26551223):
+        poly *= t
+        poly += coef
+    poly -= x * x
+    np.exp(poly, out=poly)
+    poly *= t
+    np.minimum(poly, 1, out=poly)
+    return poly
+
+
 def prob(mean, sd, values):
     """
     Returns probability of value or larger given mean and sd
     """
-    # Handle None type values
-
-    dist = abs((values - mean))/sd
-    #Double sided probability
-    return (1 - norm.cdf(dist, loc=0, scale=1)) * 2
+    dist = np.abs(np.asarray(values, dtype=float) - mean)
+    dist /= np.asarray(sd) * np.sqrt(2)
+    #Double sided probability: 2 * (1 - Phi(dist)) = erfc(dist / sqrt(2))
+    return erfc(dist)
 
-def prob_dists(bike_vectors, body_vectors, arm_angles, use="road"):
+def use_codes(use, n):
+    """
+    Input: usecase name, or integer codes (USE_CODES) / names per row, number of rows
+    Output: (n,) integer row index into USE_TABLE
+    """
+    if isinstance(use, str):
+        return np.full(n, USE_CODES[use])
+    use = np.asarray(use).reshape(-1)
+    if use.dtype.kind in "US":
+        return np.array([USE_CODES[name] for name in use])
+    if use.dtype.kind not in "iu" or ((use < 0) | (use >= len(USE_CODES))).any():
+        raise ValueError("Usecase codes must be integers in range(len(USE_CODES))", use)
+    return np.broadcast_to(use, (n,))
+
+def angle_probs(angles, use="road", combined=False):
+    """
+    Input: angles (nx3 or nx4) [knee extension, back, armpit to wrist, (closed hip)] in degrees,
+           OPTIONAL usecase name or per row codes (see use_codes), OPTIONAL combined score
+    Output: n x 3 (n x 4 with hip) probabilities of the deviation from the USE_TABLE optima
+            (combined) one more column, the product of the probabilities
+            NaN where the angle is NaN
     """
-    Input: bike, body, arm angle (degrees), [optional] usecase
+    n_angles = angles.shape[1]
+    params = USE_TABLE[use_codes(use, len(angles)), :n_angles]
+    probs = prob(params[:, :, 0], params[:, :, 1], angles)
+    if combined:
+        return np.hstack((probs, np.prod(probs, axis=1, keepdims=True)))
+    return probs
+
+def prob_dists(bike_vectors, body_vectors, arm_angles, use="road", combined=False, hip=False):
+    """
+    Input: bike, body, arm angle (degrees), [optional] usecase, [optional] combined score,
+           [optional] closed hip angle
+        use: usecase name for the batch, or per row USE_CODES integers (or names)
     Output: Computes probability of deviation from reccomended angle for each body angle
+            n x 3 (knee, back, armpit to wrist), hip adds the closed hip angle column,
+            combined adds the combined score column
+    """
+    # knee extension, back angle, armpit to wrist angle, (closed hip angle)
+    angles = all_angles(bike_vectors, body_vectors, arm_angles, hip=hip)
+    return angle_probs(angles, use, combined)
+
+def fit_scores(angles, use="road"):
+    """
+    Input: angles (nx3 or nx4 with closed hip) in degrees, OPTIONAL usecase name or per row codes
+    Output: combined fit score (n,) = product of the USE_DICT probabilities
+            NaN where any angle is NaN
+    """
+    return np.prod(angle_probs(angles, use), axis=1)
+
+##########################
+# PREPARED BODY (1 RIDER) #
+##########################
+# Body only terms (functional lower leg, alpha_4, arm chord, squares) are
+# computed once so scoring one rider against a catalog only does bike work
+
+class PreparedBody:
+    """
+    One body with its body only intermediates cached
+        body: body vector (1x6 or 1x8)
+        arm_angle: elbow angle in degrees
+    Evaluation methods take bike vectors (n x 5) [SX, SY, HX, HY, CL] only
+    and match the module functions called with the same body on every row
+    """
+
+    def __init__(self, body, arm_angle=150):
+        body = np.asarray(body, dtype=float).reshape(-1)
+        self.body = body
+        self.arm_angle = float(arm_angle)
+        self.LL, self.UL, self.TL, self.AL, self.FL = (float(v) for v in body[:5])
+        AA = body[5] * (np.pi/180)
+
+        self.UL_s = self.UL**2
+        self.TL_s = self.TL**2
+
+        # Functional lower leg and its offset from the lower leg
+        self.x_1 = np.sqrt(self.LL**2 + self.FL**2 - (2 * self.LL * self.FL * np.cos(AA)))
+        self.x_1_s = self.x_1**2
+        self.alpha_4 = np.arccos((self.FL**2 - self.LL**2 - self.x_1_s) / (-2 * self.LL * self.x_1))
+        # Reachable saddle to pedal distances (leg triangle inequality)
+        self.r_min = abs(self.UL - self.x_1)
+        self.r_max = self.UL + self.x_1
+
+        # Arm chord shoulder to wrist with the elbow bent
+        elbow = self.arm_angle * (np.pi/180)
+        self.chord_s = 2 * (self.AL / 2)**2 * (1 - np.cos(elbow))
+        self.chord = self.chord_s**0.5
+
+    def knee_extension_angle(self, bike_vectors, CA):
+        """
+        Input: bike vectors n x 5, crank angle in DEGREES (n x 1 or 1 x k)
+        Output: knee extension angle in degrees (NaN if not valid)
+        """
+        CA = CA * (np.pi/180)
+        SX = bike_vectors[:, 0:1] * -1
+        SY = bike_vectors[:, 1:2]
+        CL = bike_vectors[:, 4:5]
+
+        LX = CL * np.cos(CA) - SX
+        LY = SY - CL * np.sin(CA)
+        x_2 = np.sqrt((LX**2 + LY**2))
+
+        alpha_1 = np.arccos((self.x_1_s - self.UL_s - x_2**2) / (-2 * self.UL * x_2))
+        alpha_2 = np.arctan2(LY, LX) - alpha_1
+
+        LLY = LY - self.UL * np.sin(alpha_2)
+        LLX = LX - self.UL * np.cos(alpha_2)
+        alpha_3 = np.arctan2(LLY, LLX) - alpha_2
+
+        return (alpha_3 + self.alpha_4) * (180/np.pi)
+
+    def min_knee_extension_angle(self, bike_vectors):
+        """
+        Input: bike vectors n x 5
+        Output: n x 1 minimum knee extension angle over the pedal stroke in degrees
+                NaN if the leg cannot complete a full rotation of the cranks
+        Closed form at the bottom of the stroke: ke = pi - beta + alpha_4
+        (same as min_knee_extension_angle to rounding, one arccos per bike)
+        """
+        seat = np.sqrt(bike_vectors[:, 0:1]**2 + bike_vectors[:, 1:2]**2)
+        CL = bike_vectors[:, 4:5]
+        r = seat + CL
+        # Pedal at the top of the stroke must also be reachable
+        near = np.abs(seat - CL)
+
+        beta = np.arccos((self.UL_s + self.x_1_s - r**2) / (2 * self.UL * self.x_1))
+        ke = (np.pi - beta + self.alpha_4) * (180/np.pi)
+        valid = (near >= self.r_min) & (near <= self.r_max)
+        return np.where(valid, ke, np.nan)
+
+    def back_armpit_angles(self, bike_vectors):
+        """
+        Input: bike vectors n x 5
+        Output: tuple (back angle, armpit to wrist angle) n x 1 in degrees
+        """
+        SX = bike_vectors[:, 0:1] * -1
+        SY = bike_vectors[:, 1:2]
+        HX = bike_vectors[:, 2:3]
+        HY = bike_vectors[:, 3:4]
+
+        sth_dist_s = (HY - SY) ** 2 + (HX - SX) ** 2
+        sth_dist = sth_dist_s ** 0.5
+        sth_ang = np.arctan2((HY - SY), (HX - SX))
+
+        tors_ang = np.arccos((self.TL_s + sth_dist_s - self.chord_s) / (2 * self.TL * sth_dist))
+        back_angle = tors_ang + sth_ang
+        armpit_to_wrist = np.arccos((self.TL_s + self.chord_s - sth_dist_s) / (2 * self.TL * self.chord))
+        return (rad_to_d(back_angle), rad_to_d(armpit_to_wrist))
+
+    def all_angles(self, bike_vectors):
+        """
+        Input: bike vectors n x 5
+        Output: n x 3 (min_ke angle, back angle, awrist angle) in degrees
+        """
+        ke_ang = self.min_knee_extension_angle(bike_vectors)
+        b_angs, aw_angs = self.back_armpit_angles(bike_vectors)
+        return np.hstack((ke_ang, b_angs, aw_angs))
+
+    def validity_mask(self, bike_vectors):
+        """
+        Input: bike vectors n x 5
+        Output: n x 1 True/False mask, TRUE = Violation (same as validity_mask)
+        """
+        bike_reach = np.sqrt(
+            np.square(bike_vectors[:, 2:3] + bike_vectors[:, 0:1])
+            + np.square(bike_vectors[:, 3:4] - bike_vectors[:, 1:2])
+        )
+        mask_upper = (
+            (self.chord + self.TL > bike_reach)
+            & (self.chord + bike_reach > self.TL)
+            & (self.TL + bike_reach > self.chord)
+        )
+        straightline_seat = np.sqrt(np.square(bike_vectors[:, 0:1]) + np.square(bike_vectors[:, 1:2])) + bike_vectors[:, 4:5]
+        mask_lower = (
+            (self.x_1 + self.UL > straightline_seat)
+            & (self.x_1 + straightline_seat > self.UL)
+            & (self.UL + straightline_seat > self.x_1)
+        )
+        return ~(np.logical_and(mask_upper, mask_lower))
+
+
+def prepare_body(body, arm_angle=150):
+    """
+    Input: body vector (1x6 or 1x8), OPTIONAL elbow angle in degrees
+    Output: PreparedBody with body only terms cached
     """
-    # back angle, armpit to elbow angle, armpit to wrist angle
-    knee_angles, back_angles, awrist_angles = all_angles(bike_vectors, body_vectors, arm_angles)
-
-    k_ang_prob = prob(
-        USE_DICT[use]["opt_knee_angle"][0],
-        USE_DICT[use]["opt_knee_angle"][1],
-        knee_angles,
-    )
-    b_ang_prob = prob(
-        USE_DICT[use]["opt_back_angle"][0],
-        USE_DICT[use]["opt_back_angle"][1],
-        back_angles,
-    )
-    aw_ang_prob = prob(
-        USE_DICT[use]["opt_awrist_angle"][0],
-        USE_DICT[use]["opt_awrist_angle"][1],
-        awrist_angles,
-    )
-
-    return np.hstack((k_ang_prob, b_ang_prob, aw_ang_prob))
+    return PreparedBody(body, arm_angle)
 
 def bike_offset(bike_vector, thickness, setback):
     """